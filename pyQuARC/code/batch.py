@@ -0,0 +1,181 @@
+from .cache import MetadataCache
+from .checker import Checker
+from .downloader import BulkDownloader, Downloader
+from .local_files import map_file
+from .constants import DEFAULT_NETWORK_WORKERS
+from .session import configure_executor, configure_scheduler
+
+
+def download(
+    concept_id, metadata_format, version, cmr_host, cache_dir=None, revision_id=None
+):
+    """
+    Downloads the metadata content for `concept_id`
+
+    Args:
+        cache_dir (str): If given, the downloads are cached in this directory
+        revision_id (str): The latest revision id of the concept, if already known
+
+    Returns:
+        (tuple): (The downloaded content or None, The download errors)
+    """
+    downloader = Downloader(
+        concept_id,
+        metadata_format,
+        version,
+        cmr_host,
+        cache=MetadataCache(cache_dir) if cache_dir else None,
+        revision_id=revision_id,
+    )
+    return downloader.download(), downloader.errors
+
+
+def download_bulk(concept_ids, metadata_format, cmr_host):
+    """
+    Downloads the metadata content for all the `concept_ids` with a single request
+
+    Returns:
+        (list of tuple): (concept id, The downloaded content or None, The download errors)
+    """
+    return BulkDownloader(concept_ids, metadata_format, cmr_host).download()
+
+
+def check_concept(checker, concept_id, content, download_errors):
+    """
+    Runs all the checks on the downloaded `content` of `concept_id`
+
+    Args:
+        checker (Checker): The checker to run
+        concept_id (str): The concept id of the metadata
+        content (bytes or buffer or dict): The downloaded content (a umm record of a
+            bulk download is already decoded), None if the download failed
+        download_errors (list): The errors from the download
+
+    Returns:
+        (dict): The result in the form:
+            {
+                "concept_id": concept_id,
+                "errors": validation errors,
+                "pyquarc_errors": errors while running pyQuARC
+            }
+    """
+    if not content and not isinstance(content, dict):
+        return {
+            "concept_id": concept_id,
+            "errors": {},
+            "pyquarc_errors": download_errors,
+        }
+    validation_errors, pyquarc_errors = checker.run(content)
+    return {
+        "concept_id": concept_id,
+        "errors": validation_errors,
+        "pyquarc_errors": pyquarc_errors,
+    }
+
+
+def check_file(checker, file_path):
+    """
+    Runs all the checks on the metadata in the local file at `file_path`
+
+    Returns:
+        (dict): The result in the form:
+            {
+                "file": file_path,
+                "errors": validation errors,
+                "pyquarc_errors": errors while running pyQuARC
+            }
+    """
+    with map_file(file_path) as content:
+        validation_errors, pyquarc_errors = checker.run(content)
+    return {
+        "file": file_path,
+        "errors": validation_errors,
+        "pyquarc_errors": pyquarc_errors,
+    }
+
+
+def iter_corpus(file_paths, metadata_format):
+    """
+    Reads the records of the corpus files at `file_paths`. A corpus file is a
+    CMR search response (eg: saved from a search in the echo10, dif10 or
+    umm_json format) that holds many records.
+
+    Yields:
+        (tuple): (file path, concept id, the metadata of the record, see
+            `BulkDownloader.split`)
+    """
+    for file_path in file_paths:
+        with map_file(file_path) as content:
+            for concept_id, record in BulkDownloader.split(content, metadata_format):
+                yield file_path, concept_id, record
+
+
+def check_record(checker, file_path, concept_id, content):
+    """
+    Runs all the checks on the `content` of a record from the corpus file at `file_path`
+
+    Returns:
+        (dict): The result in the form:
+            {
+                "file": file_path,
+                "concept_id": concept_id,
+                "errors": validation errors,
+                "pyquarc_errors": errors while running pyQuARC
+            }
+    """
+    return {"file": file_path, **check_concept(checker, concept_id, content, [])}
+
+
+# State of a worker process in the process pool, set up once by `init_worker`
+_worker = {}
+
+
+def init_worker(
+    checker_kwargs,
+    rate_limit=None,
+    network_workers=DEFAULT_NETWORK_WORKERS,
+):
+    """
+    Process pool initializer. Builds the checker used for all the tasks
+    that run in this process.
+
+    Importing the checker also builds the GCMD keyword lookups
+    (`StringValidator.gcmdValidator`), so they are loaded once per process
+    instead of once per task.
+
+    Args:
+        checker_kwargs (dict): Keyword arguments for `Checker`
+        rate_limit (float): This process's share of the requests per second
+        network_workers (int): The number of threads that run the checks
+            that make requests in this process
+    """
+    configure_scheduler(rate_limit=rate_limit)
+    configure_executor(network_workers)
+    _worker["checker"] = Checker(**checker_kwargs)
+
+
+def validate_downloaded(downloaded):
+    """
+    Process pool task. Validates metadata that was already downloaded
+
+    Args:
+        downloaded (tuple): (concept id, The downloaded content or None, The download errors)
+    """
+    return check_concept(_worker["checker"], *downloaded)
+
+
+def validate_file(file_path):
+    """
+    Process pool task. Validates the local file at `file_path`
+    """
+    return check_file(_worker["checker"], file_path)
+
+
+def validate_record(record):
+    """
+    Process pool task. Validates a record read from a corpus file
+
+    Args:
+        record (tuple): (file path, concept id, the metadata of the record)
+    """
+    return check_record(_worker["checker"], *record)
@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+import tempfile
+
+from urllib.parse import quote
+
+
+class MetadataCache:
+    """
+    On-disk cache of downloaded metadata, keyed by concept id, revision id
+    and format. The payloads are stored gzip compressed.
+
+    Layout:
+        {cache_dir}/{metadata_format}/{concept_id}/{revision_id}.gz
+        {cache_dir}/{metadata_format}/{concept_id}/latest.json
+    where latest.json holds what's needed to revalidate the latest download:
+        {"revision_id": ..., "etag": ..., "last_modified": ...}
+    """
+
+    # Used as the revision id when CMR doesn't say which revision was downloaded
+    UNKNOWN_REVISION = "unknown"
+
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir (str): The directory where the cache is stored
+        """
+        self.cache_dir = cache_dir
+
+    def _concept_dir(self, concept_id, metadata_format):
+        return os.path.join(
+            self.cache_dir, quote(metadata_format, safe=""), quote(concept_id, safe="")
+        )
+
+    def _payload_path(self, concept_id, metadata_format, revision_id):
+        revision_id = quote(str(revision_id or MetadataCache.UNKNOWN_REVISION), safe="")
+        return os.path.join(
+            self._concept_dir(concept_id, metadata_format), f"{revision_id}.gz"
+        )
+
+    @staticmethod
+    def _write(path, data):
+        """
+        Writes `data` to `path` atomically, so that concurrent readers
+        (threads or processes) never see a partial file
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def get(self, concept_id, metadata_format, revision_id):
+        """
+        Reads the cached metadata of `concept_id` at `revision_id`
+
+        Returns:
+            (bytes): The metadata content, None if it is not cached
+        """
+        path = self._payload_path(concept_id, metadata_format, revision_id)
+        try:
+            with gzip.open(path, "rb") as payload_file:
+                return payload_file.read()
+        except (OSError, EOFError):
+            return None
+
+    def latest(self, concept_id, metadata_format):
+        """
+        Reads the details of the latest cached download of `concept_id`
+
+        Returns:
+            (dict): {"revision_id": ..., "etag": ..., "last_modified": ...},
+                None if nothing is cached
+        """
+        path = os.path.join(self._concept_dir(concept_id, metadata_format), "latest.json")
+        try:
+            with open(path, encoding="utf-8") as latest_file:
+                return json.load(latest_file)
+        except (OSError, json.decoder.JSONDecodeError):
+            return None
+
+    def put(
+        self,
+        concept_id,
+        metadata_format,
+        revision_id,
+        content,
+        latest=False,
+        etag=None,
+        last_modified=None,
+    ):
+        """
+        Stores the metadata `content` (bytes) of `concept_id` at `revision_id`
+
+        Args:
+            latest (bool): If True, the content is also recorded as the latest
+                revision, along with the `etag` and `last_modified` response headers
+                that are used to revalidate it
+        """
+        MetadataCache._write(
+            self._payload_path(concept_id, metadata_format, revision_id),
+            gzip.compress(content),
+        )
+        if latest:
+            MetadataCache._write(
+                os.path.join(
+                    self._concept_dir(concept_id, metadata_format), "latest.json"
+                ),
+                json.dumps(
+                    {
+                        "revision_id": revision_id,
+                        "etag": etag,
+                        "last_modified": last_modified,
+                    }
+                ).encode("utf-8"),
+            )
@@ -1,12 +1,15 @@
 import json
 
-from xmltodict import parse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque, namedtuple
+from queue import Queue
 
-from .custom_checker import CustomChecker
+from .custom_checker import CustomChecker, FieldAccessor
+from .parser import build_path_tree, xml_to_dict
+from .path_index import PathIndex
 from .schema_validator import SchemaValidator
 
-from .scheduler import Scheduler
+from .scheduler import Readiness, Scheduler
+from .session import get_executor
 from .tracker import Tracker
 
 from .custom_validator import CustomValidator
@@ -16,6 +19,30 @@ from .url_validator import UrlValidator
 
 from .constants import ECHO10_C, SCHEMA_PATHS
 
+# A rule, resolved for the metadata format of the checker. `error` is set instead
+# when the rule couldn't be resolved, and it is reported for every record.
+CompiledRule = namedtuple(
+    "CompiledRule",
+    [
+        "rule_id",
+        "func",
+        "network_bound",
+        "fields",
+        "relation",
+        "failure_message",
+        "severity",
+        "remediation",
+        "error",
+    ],
+)
+
+# One of the `fields_to_apply` of a rule. `accessors` are its fields compiled
+# (see `FieldAccessor`), and `dependencies` are (rule id, fields) pairs.
+CompiledField = namedtuple(
+    "CompiledField",
+    ["main_field", "field_dict", "accessors", "dependencies", "external_data"],
+)
+
 
 class Checker:
     """
@@ -57,11 +84,12 @@ class Checker:
             metadata_format=metadata_format,
         )
         self.schema_validator = SchemaValidator(
-            self.messages_override or self.messages, metadata_format
-        )
-        self.tracker = Tracker(
-            self.rule_mapping, self.rules_override, metadata_format=metadata_format
+            self.messages_override or self.messages,
+            metadata_format,
         )
+        # The custom checks only read these fields of the xml metadata
+        self.path_tree = build_path_tree(self._field_paths())
+        self._compile_plan()
 
     @staticmethod
     def _json_load_schema(schema_name):
@@ -81,6 +109,29 @@ class Checker:
         self.rules_override = Checker._json_load_schema(self.rules_override_file)
         self.checks_override = Checker._json_load_schema(self.checks_override_file)
 
+    def _field_paths(self):
+        """
+        Gets the paths of all the fields the rules are applied to in `metadata_format`,
+        including the fields their query parameters look at
+
+        Returns:
+            (list): The paths, each as a tuple of keys
+        """
+        paths = []
+        for rules in (self.rule_mapping, self.rules_override):
+            for rule_mapping in rules.values():
+                fields_to_apply = rule_mapping.get("fields_to_apply", {})
+                for field_dict in fields_to_apply.get(self.metadata_format, []):
+                    for field in field_dict["fields"]:
+                        accessor = FieldAccessor.compile(field)
+                        paths.append(accessor.keys)
+                        if accessor.query_params:
+                            # eg: 'DataDates/Date?Type=CREATE' looks at 'DataDates/Type'
+                            paths.append(
+                                (*accessor.keys[:-1], accessor.query_params[0])
+                            )
+        return paths
+
     @staticmethod
     def map_to_function(data_type, function):
         """
@@ -109,152 +160,312 @@ class Checker:
         messages = self.messages_override.get(rule_id) or self.messages.get(rule_id)
         return messages[msg_type] if messages else ""
 
-    def build_message(self, result, rule_id):
+    @staticmethod
+    def _format_messages(result, failure_message, severity):
         """
-        Formats the message for `rule_id` based on the result
+        Formats the `failure_message` with each of the invalid values in `result`
         """
-        failure_message = self.message(rule_id, "failure")
-        rule_mapping = self.rules_override.get(rule_id) or self.rule_mapping.get(
-            rule_id
-        )
-        severity = rule_mapping.get("severity", "error")
         messages = []
         if not (result["valid"]) and result.get("value"):
             for value in result["value"]:
-                formatted_message = failure_message
                 value = value if isinstance(value, tuple) else (value,)
                 formatted_message = failure_message.format(*value)
                 formatted_message = f"{severity.title()}: {formatted_message}"
                 messages.append(formatted_message)
         return messages
 
-    def perform_schema_check(self, xml_metadata):
+    def build_message(self, result, rule_id):
+        """
+        Formats the message for `rule_id` based on the result
+        """
+        failure_message = self.message(rule_id, "failure")
+        rule_mapping = self.rules_override.get(rule_id) or self.rule_mapping.get(
+            rule_id
+        )
+        severity = rule_mapping.get("severity", "error")
+        return Checker._format_messages(result, failure_message, severity)
+
+    def perform_schema_check(self, metadata):
         """
         Performs Schema check
+
+        Args:
+            metadata (str or bytes or object): The metadata content, or the already
+                parsed document (lxml tree or decoded json)
         """
-        return self.schema_validator.run(xml_metadata)
+        return self.schema_validator.run(metadata)
 
-    def _check_dependency_validity(self, dependency, field_dict):
+    def _compile_field(self, rule_mapping, check, field_dict):
         """
-        Checks if the dependent check called `dependency` is valid
+        Resolves everything about one of the `fields_to_apply` of a rule
+        that doesn't depend on the record
         """
-        dependency_fields = (
-            field_dict["fields"] if len(dependency) == 1 else [dependency[1]]
+        dependencies = self.scheduler.get_all_dependencies(
+            rule_mapping, check, field_dict
+        )
+        return CompiledField(
+            main_field=field_dict["fields"][0],
+            field_dict=field_dict,
+            accessors=tuple(map(FieldAccessor.compile, field_dict["fields"])),
+            dependencies=tuple(
+                (
+                    dependency[0],
+                    tuple(
+                        field_dict["fields"] if len(dependency) == 1 else [dependency[1]]
+                    ),
+                )
+                for dependency in dependencies
+            ),
+            external_data=field_dict.get("data", rule_mapping.get("data", [])),
         )
-        for field in dependency_fields:
-            if not self.tracker.read_data(dependency[0], field).get("valid"):
-                return False
-        return True
 
-    def _check_dependencies_validity(self, dependencies, field_dict):
+    def _compile_rule(self, rule_id):
         """
-        Checks if the dependent checks are valid
+        Resolves the rule mapping, check, function, fields, dependencies
+        and messages of `rule_id`
+
+        Returns:
+            (CompiledRule): The compiled rule, None if there's nothing to run
+                for the metadata format
         """
-        for dependency in dependencies:
-            if not self._check_dependency_validity(dependency, field_dict):
-                return False
-        return True
+        rule_mapping = self.rules_override.get(rule_id) or self.rule_mapping.get(
+            rule_id
+        )
+        check_id = rule_mapping.get("check_id", rule_id)
+        check = self.checks_override.get(check_id) or self.checks.get(check_id)
+        func = Checker.map_to_function(check["data_type"], check["check_function"])
+        if not func:
+            return None
+        fields_to_apply = rule_mapping.get("fields_to_apply").get(
+            self.metadata_format, {}
+        )
+        if not fields_to_apply:
+            return None
+        return CompiledRule(
+            rule_id=rule_id,
+            func=func,
+            network_bound=getattr(func, "network_bound", False),
+            fields=tuple(
+                self._compile_field(rule_mapping, check, field_dict)
+                for field_dict in fields_to_apply
+            ),
+            relation=rule_mapping.get("relation"),
+            failure_message=self.message(rule_id, "failure"),
+            severity=rule_mapping.get("severity", "error"),
+            remediation=self.message(rule_id, "remediation"),
+            error=None,
+        )
 
-    def _process_field(
-        self,
-        func,
-        check,
-        rule_id,
-        metadata_content,
-        field_dict,
-        result_dict,
-        rule_mapping,
-    ):
+    def _compile_plan(self):
         """
-        Process a single field according to the given rule and update result_dict
+        Compiles the rules that apply to the metadata format, in the order they run,
+        and sets them as the plan. Done once, so that running the custom checks on
+        a record only executes it.
         """
-        external_data = rule_mapping.get("data", [])
-        relation = rule_mapping.get("relation")
-        dependencies = self.scheduler.get_all_dependencies(
-            rule_mapping, check, field_dict
+        plan = []
+        for rule_id in self.scheduler.order_rules():
+            try:
+                compiled_rule = self._compile_rule(rule_id)
+            except Exception as e:
+                compiled_rule = CompiledRule(
+                    rule_id, None, False, (), None, None, None, None, error=str(e)
+                )
+            if compiled_rule:
+                plan.append(compiled_rule)
+        self._set_plan(
+            tuple(plan),
+            self.scheduler.dependency_graph([rule.rule_id for rule in plan]),
         )
-        main_field = field_dict["fields"][0]
-        external_data = field_dict.get("data", external_data)
-        result_dict.setdefault(main_field, {})
 
-        if not self._check_dependencies_validity(dependencies, field_dict):
-            return
+    def _set_plan(self, plan, dependency_graph):
+        """
+        Sets the plan, and builds everything that running it on each record
+        reuses: the dependency graph, the initial tracking data and the index of
+        the fields it reads
 
-        result = self.custom_checker.run(
-            func, metadata_content, field_dict, external_data, relation
+        Args:
+            plan (tuple of CompiledRule): The rules, in the order they run
+            dependency_graph (dict): The rules each rule of the plan depends on
+        """
+        self.plan = plan
+        self.plan_rules = {rule.rule_id: rule for rule in plan}
+        self.dependency_graph = dependency_graph
+        # Copied for every record, instead of being built again
+        self.readiness = Readiness(dependency_graph)
+        self.tracker = Tracker(
+            self.rule_mapping, self.rules_override, metadata_format=self.metadata_format
+        )
+        # The values of all the fields the plan reads are found in one pass per record
+        self.path_index = PathIndex(
+            accessor
+            for rule in plan
+            for field in rule.fields
+            for accessor in field.accessors
         )
 
-        self.tracker.update_data(rule_id, main_field, result["valid"])
+    def _check_dependencies_validity(self, dependencies, tracker):
+        """
+        Checks if the dependent checks are valid for all their fields
+        """
+        for rule_id, fields in dependencies:
+            for field in fields:
+                if not tracker.read_data(rule_id, field).get("valid"):
+                    return False
+        return True
+
+    def _record_result(self, rule, field, result, tracker):
+        """
+        Records the `result` of the compiled `rule` for `field` in the `tracker`
+        and adds its messages
+
+        Returns:
+            (dict): The result, None if the rule wasn't applied
+        """
+        tracker.update_data(rule.rule_id, field.main_field, result["valid"])
 
         # Avoid adding null valid results for rules that are not applied
         if result["valid"] is None:
-            return
-
-        result_dict[main_field][rule_id] = result
+            return None
 
-        message = self.build_message(result, rule_id)
+        message = Checker._format_messages(result, rule.failure_message, rule.severity)
         if message:
             result["message"] = message
-            result["remediation"] = self.message(rule_id, "remediation")
+            result["remediation"] = rule.remediation
+        return result
 
-    def _run_func(self, func, check, rule_id, metadata_content, result_dict):
+    def _start_rule(self, rule, metadata_content, tracker, index=None):
         """
-        Run the check function for `rule_id` and update `result_dict`
+        Runs the compiled `rule` on all its fields, once the rules
+        it depends on are done
+
+        Most checks are quick and run inline. The ones that make requests are
+        submitted to the shared executor, with the calls for all the fields submitted
+        at once, and their results are collected by `_finish_rule`. A field that fails
+        doesn't stop the others; only the first error is kept. The values of the
+        fields are read from `index` (see `PathIndex`), if it's given.
+
+        Returns:
+            (list, list, Exception): The (field, result) pairs of the fields that
+                are done, the (field, futures) pairs of the ones submitted to the
+                executor, and the first error, if any
         """
-        rule_mapping = self.rules_override.get(rule_id) or self.rule_mapping.get(
-            rule_id
-        )
-        list_of_fields_to_apply = rule_mapping.get("fields_to_apply").get(
-            self.metadata_format, {}
-        )
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for field_dict in list_of_fields_to_apply:
-                future = executor.submit(
-                    self._process_field,
-                    func,
-                    check,
-                    rule_id,
+        results = []
+        pending = []
+        error = None
+        if rule.error:
+            return results, pending, Exception(rule.error)
+        for field in rule.fields:
+            try:
+                if not self._check_dependencies_validity(field.dependencies, tracker):
+                    continue
+                args = (
+                    rule.func,
                     metadata_content,
-                    field_dict,
-                    result_dict,
-                    rule_mapping,
+                    field.field_dict,
+                    field.external_data,
+                    rule.relation,
                 )
-                futures.append(future)
+                if rule.network_bound:
+                    futures = self.custom_checker.submit(
+                        get_executor(), *args, accessors=field.accessors, index=index
+                    )
+                    pending.append((field, futures))
+                else:
+                    result = self.custom_checker.run(
+                        *args, accessors=field.accessors, index=index
+                    )
+                    results.append(
+                        (field, self._record_result(rule, field, result, tracker))
+                    )
+            except Exception as e:
+                error = error or e
+        return results, pending, error
+
+    def _finish_rule(self, rule, results, pending, error, tracker):
+        """
+        Collects the results of the fields of `rule` submitted to the executor
+        by `_start_rule`
 
-            # Wait for all futures to complete
-            for future in as_completed(futures):
-                # Retrieve the result or raise an exception if an error occurred
-                try:
-                    future.result()
-                except Exception as e:
-                    # Handle the exception from the thread
-                    raise e
+        Returns:
+            (list, Exception): The (field, result) pairs of all the fields,
+                and the first error, if any
+        """
+        for field, futures in pending:
+            try:
+                result = CustomChecker.collect(future.result() for future in futures)
+                results.append(
+                    (field, self._record_result(rule, field, result, tracker))
+                )
+            except Exception as e:
+                error = error or e
+        return results, error
 
     def perform_custom_checks(self, metadata_content):
         """
-        Performs custom checks
+        Performs custom checks by executing the compiled plan
+
+        Each rule starts as soon as the rules it depends on are done, so the rules
+        that wait on requests run alongside each other and alongside the rest,
+        and a record takes about as long as its slowest chain of dependent rules.
+        The results are reported in the order of the plan, as if the rules ran
+        one after another.
         """
-        ordered_rule = self.scheduler.order_rules()
+        # The validity of the rules for this record only
+        tracker = self.tracker.copy()
+        readiness = self.readiness.copy()
+        index = self.path_index.index(metadata_content)
+        ready = deque(readiness.ready())
+        waiting = {}
+        # The number of calls each waiting rule still waits for
+        remaining = {}
+        # Gets the id of the rule of each call submitted to the executor, as it ends
+        finished_calls = Queue()
+        outcomes = {}
+        while ready or waiting:
+            while ready:
+                rule = self.plan_rules[ready.popleft()]
+                results, pending, error = self._start_rule(
+                    rule, metadata_content, tracker, index
+                )
+                futures = [future for _, futures in pending for future in futures]
+                if futures:
+                    waiting[rule.rule_id] = (results, pending, error)
+                    remaining[rule.rule_id] = len(futures)
+                    for future in futures:
+                        future.add_done_callback(
+                            lambda _, rule_id=rule.rule_id: finished_calls.put(rule_id)
+                        )
+                else:
+                    outcomes[rule.rule_id] = self._finish_rule(
+                        rule, results, pending, error, tracker
+                    )
+                    ready.extend(readiness.done(rule.rule_id))
+            if waiting:
+                # Blocks until a call ends
+                rule_id = finished_calls.get()
+                remaining[rule_id] -= 1
+                if remaining[rule_id]:
+                    continue
+                results, pending, error = waiting.pop(rule_id)
+                outcomes[rule_id] = self._finish_rule(
+                    self.plan_rules[rule_id], results, pending, error, tracker
+                )
+                ready.extend(readiness.done(rule_id))
+
         result_dict = {}
         pyquarc_errors = []
-        for rule_id in ordered_rule:
-            try:
-                rule_mapping = self.rules_override.get(
-                    rule_id
-                ) or self.rule_mapping.get(rule_id)
-                check_id = rule_mapping.get("check_id", rule_id)
-                check = self.checks_override.get(check_id) or self.checks.get(check_id)
-                func = Checker.map_to_function(
-                    check["data_type"], check["check_function"]
-                )
-                if func:
-                    self._run_func(func, check, rule_id, metadata_content, result_dict)
-            except Exception as e:
+        for rule in self.plan:
+            results, error = outcomes[rule.rule_id]
+            for field in rule.fields:
+                result_dict.setdefault(field.main_field, {})
+            for field, result in results:
+                if result:
+                    result_dict[field.main_field][rule.rule_id] = result
+            if error:
                 pyquarc_errors.append(
                     {
-                        "message": f"Running check for the rule: '{rule_id}' failed.",
-                        "details": str(e),
+                        "message": f"Running check for the rule: '{rule.rule_id}' failed.",
+                        "details": str(error),
                     }
                 )
         return result_dict, pyquarc_errors
@@ -264,39 +475,20 @@ class Checker:
         Runs all checks on the `metadata_content`
 
         Args:
-            metadata_content (str): The downloaded metadata content
+            metadata_content (str or bytes or buffer or dict): The downloaded metadata
+                content, or the already decoded json (eg: a record of a bulk download)
 
         Returns:
             (dict): The results of the jsonschema check and all custom checks
         """
 
-        def _xml_postprocessor(_, key, value):
-            """
-            Sometimes the XML values contain attributes.
-            In such a case, the returned value for a field looks something like:
-
-            >> doc["DIF"]["ISO_Topic_Category"]
-                OrderedDict([('@uuid', '26ebb539-cae2-4961-9252-7f367642fa57'), ('#text', 'IMAGERY/BASE MAPS/EARTH COVER')]) #noqa
-
-            instead of the regular:
-            >> doc["DIF"]["ISO_Topic_Category"]
-                IMAGERY/BASE MAPS/EARTH COVER
-
-            this postprocessor is used to get the regular value even in cases
-            where attrs are present
-            """
-            try:
-                return key, value["#text"]
-            except (KeyError, TypeError):
-                return key, value
-
-        kwargs = {}
-        parser = json.loads
+        # Parsed once, for both the schema check and the custom checks
+        document, result_schema = self.schema_validator.parse_and_validate(
+            metadata_content
+        )
+        json_metadata = document
         if not self.metadata_format.startswith("umm-"):
-            parser = parse
-            kwargs = {"postprocessor": _xml_postprocessor}
-        json_metadata = parser(metadata_content, **kwargs)
-        result_schema = self.perform_schema_check(metadata_content)
+            json_metadata = xml_to_dict(document, self.path_tree)
         result_custom, pyquarc_errors = self.perform_custom_checks(json_metadata)
         result = {**result_schema, **result_custom}
         return result, pyquarc_errors
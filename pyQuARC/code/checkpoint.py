@@ -0,0 +1,100 @@
+import json
+import os
+
+
+class Checkpoint:
+    """
+    Keeps track of the concept ids that are already validated in a file,
+    so that an interrupted run can be resumed without redoing them
+    """
+
+    def __init__(self, path, resume=False):
+        """
+        Args:
+            path (str): The path to the checkpoint file
+            resume (bool): If True, the concept ids already in the checkpoint file
+                are considered done. Otherwise the file is started over.
+        """
+        self.path = path
+        if resume:
+            self._drop_partial_line()
+        self.completed = self._load() if resume else {}
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _drop_partial_line(self):
+        """
+        Cuts off the last line of the checkpoint file if it was cut short by
+        a crash, so that the entries added next start on a line of their own
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as checkpoint_file:
+            end = checkpoint_file.seek(0, os.SEEK_END)
+            if not end:
+                return
+            checkpoint_file.seek(end - 1)
+            if checkpoint_file.read(1) == b"\n":
+                return
+            # Looks for the last complete line from the end, a chunk at a time
+            while end:
+                start = max(0, end - 4096)
+                checkpoint_file.seek(start)
+                newline = checkpoint_file.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    checkpoint_file.truncate(start + newline + 1)
+                    return
+                end = start
+            checkpoint_file.truncate(0)
+
+    def _load(self):
+        """
+        Reads the checkpoint file
+
+        Returns:
+            (dict): The completed concept ids mapped to their revision ids
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, encoding="utf-8") as checkpoint_file:
+            for line in checkpoint_file:
+                try:
+                    entry = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    # Only in the files written before the partial lines were dropped
+                    continue
+                completed[entry["concept_id"]] = entry.get("revision_id")
+        return completed
+
+    def is_done(self, concept_id, revision_id=None):
+        """
+        Checks if `concept_id` was already validated. If both the current and the
+        checkpointed revision ids are known, they have to match.
+        """
+        if concept_id not in self.completed:
+            return False
+        done_revision_id = self.completed[concept_id]
+        if revision_id and done_revision_id:
+            return str(revision_id) == str(done_revision_id)
+        return True
+
+    def mark_done(self, concept_id, revision_id=None):
+        """
+        Records `concept_id` (at `revision_id`) as validated
+        """
+        self.completed[concept_id] = revision_id
+        self._file.write(
+            json.dumps({"concept_id": concept_id, "revision_id": revision_id}) + "\n"
+        )
+        # Flushed right away, since the point is to survive a crash
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
@@ -87,3 +87,26 @@ DATE_FORMATS = [
     "%Y-%m",  # Year to month
     "%Y",  # Year
 ]
+
+# Number of concurrent downloads feeding the validators
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+# Number of hosts whose connections are kept alive by the HTTP session of each thread
+DEFAULT_POOL_SIZE = 10
+
+# Number of threads running the checks that make requests (eg: the URL checks)
+DEFAULT_NETWORK_WORKERS = 10
+
+# With worker processes, the share of the rate limit used by the downloads in the
+# main process. The workers share the rest, for the checks that make requests.
+DOWNLOAD_RATE_SHARE = 0.5
+
+# Retries of the requests to CMR that failed because of throttling, server errors or timeouts
+MAX_RETRIES = 5
+# The base (in seconds) of the exponential backoff between the retries, and its cap
+BACKOFF_FACTOR = 0.5
+MAX_BACKOFF = 60
+# The longest time (in seconds) a request to CMR is retried for
+MAX_RETRY_TIME = 120
+# Timeout (in seconds) of the requests to CMR
+REQUEST_TIMEOUT = 60
@@ -1,5 +1,5 @@
+from functools import lru_cache
 from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 class CustomChecker:
@@ -11,72 +11,23 @@ class CustomChecker:
         pass
 
     @staticmethod
-    def _get_path_value_recursively(
-        subset_of_metadata_content, path_list, container, query_params=None
-    ):
+    def _split_path(path_string):
         """
-        Gets the path values recursively while handling list or dictionary in `subset_of_metadata_content`
-        Adds the values to `container`
+        Splits the field path into its keys and its query parameters
 
         Args:
-            subset_of_metadata_content (dict or list or str):
-                        The value of the field at a certain point;
-                        changes during each level of recursion
-            path_list (list): The path of the field as a list
-                         Example: 'Collection/RangeDateTime/StartDate' ->
-                                  ['Collection', 'RangeDateTime', 'StartDate']
-            container (set): The container that holds all the path values
-            query_params (list): The [key, value] pair to distinguish a field in umm-c
-                                eg: ["Type", "DELETE"]
+            path_string (str): The path of the field. Example: 'DataDates/Date?Type=CREATE'
+
+        Returns:
+            (list, list): The keys of the path (eg: ['DataDates', 'Date']) and
+                          the [key, value] query pair if any (eg: ['Type', 'CREATE'])
         """
-        try:
-            root_content = subset_of_metadata_content[path_list[0]]
-        except KeyError:
-            # this is needed because GCMD keywords check needs the placement
-            # of the values in the returned list
-            container.append(None)
-            return
-        except IndexError:
-            container.append(subset_of_metadata_content)
-            return
-        new_path = path_list[1:]
-        if (
-            isinstance(root_content, str)
-            or isinstance(root_content, int)
-            or isinstance(root_content, float)
-        ):
-            container.append(root_content)
-            return
-        elif isinstance(root_content, list):
-            if not new_path:
-                container.append(root_content)
-                return
-            if len(new_path) == 1 and query_params:
-                try:
-                    root_content = next(
-                        (
-                            x
-                            for x in root_content
-                            if x[query_params[0]] == query_params[1]
-                        )
-                    )
-                    root_content = root_content[new_path[0]]
-                    container.append(root_content)
-                except:
-                    container.append(None)
-                return
-            for each in root_content:
-                try:
-                    CustomChecker._get_path_value_recursively(
-                        each, new_path, container, query_params
-                    )
-                except KeyError:
-                    container.append(None)
-                    continue
-        elif isinstance(root_content, dict):
-            CustomChecker._get_path_value_recursively(
-                root_content, new_path, container, query_params
-            )
+        query_params = None
+        parsed = urlparse(path_string)
+        path = parsed.path.split("/")
+        if key_value := parsed.query:
+            query_params = key_value.split("=")
+        return path, query_params
 
     @staticmethod
     def _get_path_value(content_to_validate, path_string):
@@ -87,22 +38,9 @@ class CustomChecker:
             path_string (str): The path of the field. Example: 'Collection/RangeDateTime/StartDate'
 
         Returns:
-            (bool, set) If the path exists, (True, set of values of the path);
-                        else (False, empty set)
+            (list): The values of the field (see `FieldAccessor.values`)
         """
-
-        container = list()
-        query_params = None
-
-        parsed = urlparse(path_string)
-        path = parsed.path.split("/")
-        if key_value := parsed.query:
-            query_params = key_value.split("=")
-
-        CustomChecker._get_path_value_recursively(
-            content_to_validate, path, container, query_params
-        )
-        return container
+        return FieldAccessor.compile(path_string).values(content_to_validate)
 
     @staticmethod
     def _process_argument(arg, func, relation, external_data, external_relation):
@@ -131,8 +69,88 @@ class CustomChecker:
         func_return = func(*function_args)
         return func_return
 
+    @staticmethod
+    def _arguments(content_to_validate, field_dict, accessors=None, index=None):
+        """
+        Gets the values of the fields in `field_dict`, grouped into the
+        arguments of each call to the check function. They are read from
+        `index` (see `PathIndex`) if it's given.
+        """
+        if accessors is None:
+            accessors = map(FieldAccessor.compile, field_dict["fields"])
+        if index is not None:
+            return zip(*map(index.get, accessors))
+        return zip(
+            *(accessor.values(content_to_validate) for accessor in accessors)
+        )
+
+    @staticmethod
+    def collect(func_returns):
+        """
+        Combines what the check function returned for each of the arguments
+
+        Args:
+            func_returns (iterable): The return values of the check function
+
+        Returns:
+            (dict): The result of the check (see `run`)
+        """
+        invalid_values = []
+        validity = None
+        for func_return in func_returns:
+            valid = func_return["valid"]  # can be True, False or None
+            if valid is not None:
+                if valid:
+                    validity = validity or (validity is None)
+                else:
+                    if "value" in func_return:
+                        invalid_values.append(func_return["value"])
+                    validity = False
+        return {"valid": validity, "value": invalid_values}
+
+    def submit(
+        self,
+        executor,
+        func,
+        content_to_validate,
+        field_dict,
+        external_data,
+        external_relation,
+        accessors=None,
+        index=None,
+    ):
+        """
+        Same as `run`, but the calls to the check function are submitted to `executor`.
+        Meant for the checks that wait on the network.
+
+        Returns:
+            (list of concurrent.futures.Future): The calls, in the order of the
+                arguments. Their results are combined with `collect`.
+        """
+        relation = field_dict.get("relation")
+        return [
+            executor.submit(
+                self._process_argument,
+                arg,
+                func,
+                relation,
+                external_data,
+                external_relation,
+            )
+            for arg in CustomChecker._arguments(
+                content_to_validate, field_dict, accessors, index
+            )
+        ]
+
     def run(
-        self, func, content_to_validate, field_dict, external_data, external_relation
+        self,
+        func,
+        content_to_validate,
+        field_dict,
+        external_data,
+        external_relation,
+        accessors=None,
+        index=None,
     ):
         """
         Runs the custom check based on `func` to the `content_to_validate`'s `field_dict` path
@@ -146,6 +164,9 @@ class CustomChecker:
                 }
             func (function): The function reference to the check
             external_data (list): External data required by the check if any
+            accessors (list of FieldAccessor): The fields already compiled, if any
+            index (RecordIndex): The values of the fields of the record, if they
+                were already found
 
         Returns:
             (dict): The result of the check in the form:
@@ -154,46 +175,120 @@ class CustomChecker:
                     "value": "The instance value/s"
                 }
         """
-        fields = field_dict["fields"]
-        field_values = []
         relation = field_dict.get("relation")
-        result = {"valid": None}
-        for _field in fields:
-            value = CustomChecker._get_path_value(content_to_validate, _field)
-            field_values.append(value)
-        args = zip(*field_values)
+        return CustomChecker.collect(
+            self._process_argument(
+                arg, func, relation, external_data, external_relation
+            )
+            for arg in CustomChecker._arguments(
+                content_to_validate, field_dict, accessors, index
+            )
+        )
 
-        invalid_values = []
-        validity = None
 
-        # Process arguments using multithreading
-        with ThreadPoolExecutor() as executor:
-            future_results = []
-            for arg in args:
-                future = executor.submit(
-                    self._process_argument,
-                    arg,
-                    func,
-                    relation,
-                    external_data,
-                    external_relation,
-                )
-                future_results.append(future)
-
-            # Retrieve results from futures
-            for future in as_completed(future_results):
+class FieldAccessor:
+    """
+    A field path of the rules, compiled once: its keys, and the filter of its
+    query parameters (eg: 'DataDates/Date?Type=CREATE' reads the 'Date' of the
+    'DataDates' whose 'Type' is 'CREATE')
+    """
+
+    def __init__(self, path_string):
+        """
+        Args:
+            path_string (str): The path of the field. Example: 'Collection/RangeDateTime/StartDate'
+        """
+        self.path_string = path_string
+        path, query_params = CustomChecker._split_path(path_string)
+        self.keys = tuple(path)
+        self.query_params = query_params and tuple(query_params)
+        # The key of the field in a `PathIndex`
+        self.key = (self.keys, self.query_params)
+        self.matches = None
+        if self.query_params and len(self.query_params) > 1:
+            query_key, query_value = self.query_params[:2]
+            self.matches = lambda item: item[query_key] == query_value
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def compile(path_string):
+        """
+        Gets the accessor of `path_string`, compiling it only the first time.
+        The paths of the rules are far fewer than the size of the cache.
+
+        Args:
+            path_string (str): The path of the field
+
+        Returns:
+            (FieldAccessor): The accessor
+        """
+        return FieldAccessor(path_string)
+
+    def select(self, items):
+        """
+        Gets the value of the last key in the first of `items` that has the
+        query parameters
+
+        Args:
+            items (list): The values of the field before the last key
+
+        Returns:
+            (object): The value, None if there is no such item
+        """
+        try:
+            return next(item for item in items if self.matches(item))[self.keys[-1]]
+        except Exception:
+            # Including the malformed query parameters
+            return None
+
+    def values(self, content_to_validate):
+        """
+        Gets the values of the field in `content_to_validate`, following the lists
+        along the path in order
+
+        A None is added for each missing field, because the GCMD keywords check needs
+        the placement of the values in the returned list. A list found at the end of
+        the path, or a str or number found before it, is added as it is. A field that
+        can't be read (eg: a key looked up in a str) raises an error.
+
+        Args:
+            content_to_validate (dict): The metadata content
+
+        Returns:
+            (list): The values of the field
+        """
+        keys = self.keys
+        last = len(keys)
+        container = []
+        # The values still to look into, with the number of keys already followed
+        stack = [(content_to_validate, 0)]
+        while stack:
+            subset_of_metadata_content, depth = stack.pop()
+            while True:
+                if depth == last:
+                    container.append(subset_of_metadata_content)
+                    break
                 try:
-                    func_return = future.result()
-                    valid = func_return["valid"]  # can be True, False or None
-                    if valid is not None:
-                        if valid:
-                            validity = validity or (validity is None)
-                        else:
-                            if "value" in func_return:
-                                invalid_values.append(func_return["value"])
-                            validity = False
-                except Exception as e:
-                    raise e
-        result["valid"] = validity
-        result["value"] = invalid_values
-        return result
+                    root_content = subset_of_metadata_content[keys[depth]]
+                except KeyError:
+                    container.append(None)
+                    break
+                except IndexError:
+                    container.append(subset_of_metadata_content)
+                    break
+                depth += 1
+                if isinstance(root_content, dict):
+                    subset_of_metadata_content = root_content
+                elif isinstance(root_content, list):
+                    if depth == last:
+                        container.append(root_content)
+                    elif depth == last - 1 and self.query_params:
+                        container.append(self.select(root_content))
+                    else:
+                        stack.extend((each, depth) for each in reversed(root_content))
+                    break
+                else:
+                    if isinstance(root_content, (str, int, float)):
+                        container.append(root_content)
+                    break
+        return container
@@ -1,7 +1,7 @@
 from .base_validator import BaseValidator
 from .string_validator import StringValidator
 
-from .utils import cmr_request, if_arg, set_cmr_prms
+from .utils import cmr_request, if_arg, network_bound, set_cmr_prms
 
 
 class CustomValidator(BaseValidator):
@@ -143,6 +143,7 @@ class CustomValidator(BaseValidator):
             return {"valid": validity, "value": value}
 
     @staticmethod
+    @network_bound
     def granule_sensor_presence_check(
         sensor_values, collection_shortname=None, version=None, dataset_id=None
     ):
@@ -4,7 +4,7 @@ import re
 from datetime import datetime
 
 from .base_validator import BaseValidator
-from .utils import cmr_request, if_arg, set_cmr_prms, get_date_time
+from .utils import cmr_request, if_arg, network_bound, set_cmr_prms, get_date_time
 
 
 class DatetimeValidator(BaseValidator):
@@ -116,6 +116,7 @@ class DatetimeValidator(BaseValidator):
         return {"valid": result, "value": (str(first), str(second))}
 
     @staticmethod
+    @network_bound
     def validate_datetime_against_granules(
         datetime_string, collection_shortname, version, sort_key, time_key
     ):
@@ -156,6 +157,7 @@ class DatetimeValidator(BaseValidator):
         return {"valid": validity, "value": (date_time, last_granule_datetime)}
 
     @staticmethod
+    @network_bound
     @if_arg
     def validate_ending_datetime_against_granules(
         ending_datetime, collection_shortname, version
@@ -175,6 +177,7 @@ class DatetimeValidator(BaseValidator):
         )
 
     @staticmethod
+    @network_bound
     @if_arg
     def validate_beginning_datetime_against_granules(
         beginning_datetime, collection_shortname, version
@@ -1,9 +1,14 @@
 import json
 import re
+
 import requests
 
+from lxml import etree
 from urllib.parse import urlparse
 
+from .json_backend import loads
+from .parser import open_buffer
+from .session import cmr_get, cmr_post
 from .utils import get_cmr_url, get_headers
 
 
@@ -18,6 +23,8 @@ class Downloader:
     GRANULE = "granule"
     INVALID = "invalid"
 
+    NO_RESPONSE_MESSAGE = "CMR couldn't be reached, even after retrying. Try again later."
+
     FORMAT_MAP = {
         "echo-c": "echo10",
         "echo-g": "echo10",
@@ -27,20 +34,32 @@ class Downloader:
     }
 
     def __init__(
-        self, concept_id, metadata_format, version=None, cmr_host=get_cmr_url()
+        self,
+        concept_id,
+        metadata_format,
+        version=None,
+        cmr_host=get_cmr_url(),
+        cache=None,
+        revision_id=None,
     ):
         """
         Args:
             concept_id (str): The concept id of the metadata to download
             metadata_format (str): The file format of the metadata to download
             version (str): The version of the metadata to download
+            cache (MetadataCache): If given, the downloads are cached on disk and
+                reused as long as they are current
+            revision_id (str): The latest revision id of the concept, if already known
+                (eg: from a CMR query). Used to find a current copy in the `cache`.
         """
         self.concept_id = concept_id
         self.version = version
         self.metadata_format = metadata_format
+        self.cache = cache
+        self.revision_id = revision_id
         self.errors = []
 
-        # big XML string or dict is stored here
+        # the raw bytes of the big XML or JSON document are stored here
         self.downloaded_content = None
 
         parsed_url = urlparse(cmr_host)
@@ -82,12 +101,102 @@ class Downloader:
 
         self.errors.append({"type": error_message_code, "details": kwargs})
 
+    def _latest_revision_id(self):
+        """
+        Looks up the latest revision id of the concept with a CMR search,
+        which is much lighter than downloading the metadata
+
+        Returns:
+            (str) The revision id, None if the lookup failed
+        """
+        concept_type = Downloader._concept_id_type(self.concept_id)
+        url = f"{self.cmr_host}/search/{concept_type}s?concept_id={self.concept_id}"
+        try:
+            response = cmr_get(url, headers=get_headers())
+        except (requests.ConnectionError, requests.Timeout):
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            results = etree.fromstring(response.content)
+        except etree.XMLSyntaxError:
+            return None
+        return results.findtext("references/reference/revision-id")
+
+    def _read_cache(self):
+        """
+        Reads the metadata from the cache, if the cached copy is known to be current
+        without downloading it again
+
+        Returns:
+            (bytes) The cached metadata content, None otherwise
+        """
+        revision_id = self.version or self.revision_id
+        if not revision_id:
+            latest = self.cache.latest(self.concept_id, self.metadata_format)
+            if not latest or latest.get("etag") or latest.get("last_modified"):
+                # Revalidated with a conditional download instead
+                return None
+            revision_id = self._latest_revision_id()
+        if not revision_id:
+            return None
+        return self.cache.get(self.concept_id, self.metadata_format, revision_id)
+
+    def _revalidation_headers(self):
+        """
+        The conditional request headers that revalidate the latest cached copy
+
+        Returns:
+            (tuple): (The headers, The details of the latest cached copy)
+        """
+        latest = None
+        if self.cache and not self.version:
+            latest = self.cache.latest(self.concept_id, self.metadata_format)
+        headers = {}
+        if latest and latest.get("etag"):
+            headers["If-None-Match"] = latest["etag"]
+        if latest and latest.get("last_modified"):
+            headers["If-Modified-Since"] = latest["last_modified"]
+        return headers, latest
+
+    def _write_cache(self, response):
+        revision_id = (
+            response.headers.get("CMR-Revision-Id") or self.version or self.revision_id
+        )
+        self.cache.put(
+            self.concept_id,
+            self.metadata_format,
+            revision_id,
+            response.content,
+            latest=not self.version,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    @staticmethod
+    def _get(url, conditional_headers):
+        """
+        Requests `url` from CMR with the `conditional_headers`
+
+        Returns:
+            (requests.Response): The response
+        """
+        headers = {**(get_headers() or {}), **conditional_headers}
+        response = cmr_get(url, headers=headers)
+
+        # if the authorization token is invalid, even public metadata that doesn't require the token is inaccessible
+        # this works around that
+        if response.status_code == 401:  # if token invalid, try without token
+            response = cmr_get(url, headers=conditional_headers)
+        return response
+
     def download(self):
         """
         Downloads metadata by calling the CMR API
 
         Returns:
-            (str) The JSON string if download is successful, None otherwise
+            (bytes) The metadata content as it was downloaded if the download
+                is successful, None otherwise
         """
 
         # is the concept id valid? if not, log error
@@ -95,15 +204,38 @@ class Downloader:
             self.log_error("invalid_concept_id", {"concept_id": self.concept_id})
             return
 
+        if self.cache and (content := self._read_cache()):
+            self.downloaded_content = content
+            return self.downloaded_content
+
         # constructs url based on concept id
         url = self._construct_url()
-        headers = get_headers()
-        response = requests.get(url, headers=headers)
-
-        # if the authorization token is invalid, even public metadata that doesn't require the token is inaccessible
-        # this works around that
-        if response.status_code == 401:  # if token invalid, try without token
-            response = requests.get(url)
+        conditional_headers, latest = self._revalidation_headers()
+        try:
+            response = self._get(url, conditional_headers)
+            # the cached copy is still current
+            if response.status_code == 304 and latest:
+                content = self.cache.get(
+                    self.concept_id, self.metadata_format, latest["revision_id"]
+                )
+                if content:
+                    self.downloaded_content = content
+                    return self.downloaded_content
+                # the cached copy is gone (eg: removed from the cache directory)
+                response = self._get(url, {})
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # Not recorded as done, so it's downloaded again on resume
+            self.log_error(
+                "request_failed",
+                {
+                    "concept_id": self.concept_id,
+                    "url": url,
+                    "status_code": None,
+                    "message": Downloader.NO_RESPONSE_MESSAGE,
+                    "details": str(e),
+                },
+            )
+            return
 
         # gets the response, makes sure it's 200, puts it in an object variable
         if response.status_code != 200:
@@ -124,8 +256,11 @@ class Downloader:
             )
             return
 
+        if self.cache:
+            self._write_cache(response)
+
         # stores the data in the downloaded_content variable
-        self.downloaded_content = response.text
+        self.downloaded_content = response.content
         return self.downloaded_content
 
     @staticmethod
@@ -150,3 +285,207 @@ class Downloader:
             concept_id_type = Downloader.GRANULE
 
         return concept_id_type
+
+
+class BulkDownloader:
+    """
+    Downloads the metadata of many concept ids with a single CMR search request
+    """
+
+    BASE_URL = "{cmr_host}/search/{concept_type}s.{extension}"
+
+    # The maximum page size allowed by CMR
+    MAX_BATCH_SIZE = 2000
+
+    FORMAT_MAP = {
+        "echo-c": "echo10",
+        "echo-g": "echo10",
+        "umm-c": "umm_json",
+        "umm-g": "umm_json",
+        "dif10": "dif10",
+    }
+
+    def __init__(self, concept_ids, metadata_format, cmr_host=get_cmr_url()):
+        """
+        Args:
+            concept_ids (list of str): The concept ids of the metadata to download,
+                at most `MAX_BATCH_SIZE` of them
+            metadata_format (str): The file format of the metadata to download
+        """
+        self.concept_ids = concept_ids
+        self.metadata_format = metadata_format
+        self.errors = {concept_id: [] for concept_id in concept_ids}
+
+        parsed_url = urlparse(cmr_host)
+        self.cmr_host = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def log_error(self, concept_id, error_message_code, kwargs):
+        """
+        Logs errors for `concept_id` in self.errors
+
+        Args:
+            concept_id (str): The concept id the error belongs to
+            error_message_code (str): The key to the ERROR_MESSAGES dict
+            kwargs (dict): Any keyword arguments required for the error string
+        """
+        self.errors[concept_id].append({"type": error_message_code, "details": kwargs})
+
+    def _construct_url(self, concept_type):
+        extension = BulkDownloader.FORMAT_MAP.get(self.metadata_format, "echo10")
+        return BulkDownloader.BASE_URL.format(
+            cmr_host=self.cmr_host, concept_type=concept_type, extension=extension
+        )
+
+    @staticmethod
+    def _split_xml(content):
+        """
+        Splits an echo10 or dif10 CMR search response into the individual records
+
+        Args:
+            content (bytes): The search response. In the form:
+                <results>
+                    <hits>...</hits>
+                    <result concept-id="..." revision-id="...">
+                        <Collection>...</Collection>
+                    </result>
+                    ...
+                </results>
+
+        Yields:
+            (tuple): (concept id, the metadata of the record as utf-8 encoded xml)
+        """
+        for _, result in etree.iterparse(open_buffer(content), tag="result"):
+            record = next(iter(result), None)
+            if record is not None:
+                yield result.get("concept-id"), etree.tostring(
+                    record, encoding="UTF-8", xml_declaration=False, with_tail=False
+                )
+            result.clear()
+
+    @staticmethod
+    def _split_json(content):
+        """
+        Splits an umm_json CMR search response into the individual records
+
+        Args:
+            content (bytes): The search response. In the form:
+                {"hits": ..., "items": [{"meta": {...}, "umm": {...}}, ...]}
+
+        Yields:
+            (tuple): (concept id, the metadata of the record, already decoded)
+        """
+        for item in loads(content).get("items", []):
+            # Validated as it is, instead of being encoded and decoded again
+            yield item["meta"]["concept-id"], item["umm"]
+
+    @staticmethod
+    def split(content, metadata_format):
+        """
+        Splits a CMR search response (or a saved copy of one) into the individual records
+
+        Args:
+            content (bytes or buffer): The search response
+            metadata_format (str): The format of the records
+
+        Returns:
+            (iterator of tuple): (concept id, the metadata of the record: xml as
+                bytes, or umm json as the decoded dict)
+        """
+        if metadata_format.startswith("umm-"):
+            return BulkDownloader._split_json(content)
+        return BulkDownloader._split_xml(content)
+
+    def _download_batch(self, concept_type, concept_ids):
+        """
+        Downloads the metadata of `concept_ids` that are all of the `concept_type`
+
+        Returns:
+            (dict): The metadata content of each concept id that was found
+        """
+        url = self._construct_url(concept_type)
+        # Long lists of concept ids don't fit in a url, so they are sent as a form
+        data = {"concept_id[]": concept_ids, "page_size": len(concept_ids)}
+        headers = get_headers()
+        try:
+            response = cmr_post(url, data=data, headers=headers)
+
+            # if the authorization token is invalid, even public metadata that doesn't require the token is inaccessible
+            # this works around that
+            if response.status_code == 401:  # if token invalid, try without token
+                response = cmr_post(url, data=data)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            for concept_id in concept_ids:
+                self.log_error(
+                    concept_id,
+                    "request_failed",
+                    {
+                        "concept_id": concept_id,
+                        "url": url,
+                        "status_code": None,
+                        "message": Downloader.NO_RESPONSE_MESSAGE,
+                        "details": str(e),
+                    },
+                )
+            return {}
+
+        if response.status_code != 200:
+            message = "Something went wrong while downloading the requested metadata. Make sure all the inputs are correct."
+            try:
+                details = json.loads(response.text).get("errors")
+            except (json.decoder.JSONDecodeError, KeyError):
+                details = "N/A"
+            for concept_id in concept_ids:
+                self.log_error(
+                    concept_id,
+                    "request_failed",
+                    {
+                        "concept_id": concept_id,
+                        "url": url,
+                        "status_code": response.status_code,
+                        "message": message,
+                        "details": details,
+                    },
+                )
+            return {}
+
+        return dict(BulkDownloader.split(response.content, self.metadata_format))
+
+    def download(self):
+        """
+        Downloads the metadata of all the concept ids by calling the CMR search API
+
+        Returns:
+            (list of tuple): (concept id, the metadata content or None if the download
+                failed, the download errors of the concept id) in the order of `concept_ids`
+        """
+        contents = {}
+        concept_ids_by_type = {}
+        for concept_id in self.concept_ids:
+            concept_type = Downloader._concept_id_type(concept_id)
+            if concept_type == Downloader.INVALID:
+                self.log_error(
+                    concept_id, "invalid_concept_id", {"concept_id": concept_id}
+                )
+                continue
+            concept_ids_by_type.setdefault(concept_type, []).append(concept_id)
+
+        for concept_type, concept_ids in concept_ids_by_type.items():
+            contents.update(self._download_batch(concept_type, concept_ids))
+            for concept_id in concept_ids:
+                if concept_id not in contents and not self.errors[concept_id]:
+                    self.log_error(
+                        concept_id,
+                        "request_failed",
+                        {
+                            "concept_id": concept_id,
+                            "url": self._construct_url(concept_type),
+                            "status_code": 404,
+                            "message": "The requested metadata was not found in the search results.",
+                            "details": "N/A",
+                        },
+                    )
+
+        return [
+            (concept_id, contents.get(concept_id), self.errors[concept_id])
+            for concept_id in self.concept_ids
+        ]
@@ -1,7 +1,7 @@
 import csv
 import os
-import requests
 
+from .session import get_external_session
 from .utils import get_headers
 
 from .constants import SCHEMA_PATHS, GCMD_LINKS, VERSION_FILE
@@ -121,7 +121,7 @@ class GcmdValidator:
             try:
                 for keyword, link in GCMD_LINKS.items():
                     # Downloading updated gcmd keyword files
-                    response = requests.get(link, headers=headers)
+                    response = get_external_session().get(link, headers=headers)
                     data = response.text
                     with open(
                         SCHEMA_PATHS[keyword], "w", encoding="utf-8"
@@ -0,0 +1,82 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson:
+    # Kept as close as possible to the output of the standard library: datetimes and
+    # dataclasses go through `default` too, and non-string keys are converted to strings
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+# `orjson` decodes the integers that don't fit in 64 bits as floats instead of
+# failing, so any run of digits that long is left to the standard library
+LONG_DIGITS = re.compile(r"\d{19}")
+LONG_DIGITS_BYTES = re.compile(rb"\d{19}")
+
+
+def loads(content):
+    """
+    Decodes json with `orjson` if it's installed, with the standard library otherwise.
+    The standard library is also used for what `orjson` doesn't support
+    (eg: NaN, infinity, integers over 64 bits), so the results are the same either way.
+
+    Args:
+        content (str or bytes or buffer): The json string. Other buffers
+            (eg: memory-mapped files) are read through a memoryview.
+
+    Returns:
+        (object): The decoded value
+    """
+    if isinstance(content, (str, bytes, bytearray)):
+        return _loads(content)
+    # Released before returning, so that the buffer can be closed
+    with memoryview(content) as view:
+        return _loads(view)
+
+
+def _loads(content):
+    long_digits = LONG_DIGITS if isinstance(content, str) else LONG_DIGITS_BYTES
+    if orjson and not long_digits.search(content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Raises the same error as before, if it's really invalid
+            pass
+    if isinstance(content, memoryview):
+        # The standard library only decodes str, bytes and bytearray
+        content = content.tobytes()
+    return json.loads(content)
+
+
+def dumps(value, default=None):
+    """
+    Encodes `value` as compact json (no spaces after the separators, and the
+    non-ASCII characters as they are) with `orjson` if it's installed, with the
+    standard library otherwise. The output is the same either way, except for
+    the notation of some floats (eg: `1e16` with `orjson`, `1e+16` without),
+    which decode to the same value.
+
+    Args:
+        value (object): The value to encode
+        default (func): Called for the values that can't be encoded otherwise,
+            to get an encodable version of them
+
+    Returns:
+        (str): The json string
+    """
+    if orjson:
+        try:
+            return orjson.dumps(value, default=default, option=ORJSON_OPTIONS).decode()
+        except orjson.JSONEncodeError:
+            # Raises the same error as before, if it really can't be encoded
+            pass
+    return json.dumps(
+        value, default=default, separators=(",", ":"), ensure_ascii=False
+    )
@@ -0,0 +1,58 @@
+import mmap
+import os
+
+from contextlib import contextmanager
+
+
+@contextmanager
+def map_file(file_path):
+    """
+    Opens the local file at `file_path` memory-mapped, so that it is read
+    from the OS page cache (shared by all the processes reading it) instead
+    of being copied to the heap
+
+    Args:
+        file_path (str): The path of the file
+
+    Yields:
+        (mmap.mmap or bytes): The content of the file. Files that can't be
+            memory-mapped (eg: empty files, pipes) are read instead.
+    """
+    with open(os.path.abspath(file_path), "rb") as local_file:
+        try:
+            content = mmap.mmap(local_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            content = None
+        if content is None:
+            yield local_file.read()
+            return
+        with content:
+            yield content
+
+
+def expand_file_paths(paths):
+    """
+    Expands the directories in `paths` to the files in them (recursively,
+    in alphabetical order, skipping hidden files and directories)
+
+    Args:
+        paths (list of str): The paths of the files and directories
+
+    Returns:
+        (list of str): The paths of the files
+    """
+    file_paths = []
+    for path in paths:
+        if not os.path.isdir(path):
+            file_paths.append(path)
+            continue
+        for directory, directories, files in os.walk(path):
+            directories[:] = sorted(
+                name for name in directories if not name.startswith(".")
+            )
+            file_paths.extend(
+                os.path.join(directory, name)
+                for name in sorted(files)
+                if not name.startswith(".")
+            )
+    return file_paths
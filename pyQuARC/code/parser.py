@@ -0,0 +1,233 @@
+import mmap
+
+from io import BytesIO
+from lxml import etree
+
+from .json_backend import loads
+
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# The types the metadata content can have before it is parsed
+# (eg: memory-mapped local files)
+CONTENT_TYPES = (str, bytes, bytearray, memoryview, mmap.mmap)
+
+# {(tag, prefix): the element name as written in the document}
+_element_names = {}
+
+
+class BufferReader:
+    """
+    A read-only file object over a buffer (eg: a memory-mapped file), for the
+    parsers that read from files. Unlike `BytesIO`, it doesn't copy the whole buffer,
+    only the chunk that is read each time.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.position = 0
+
+    def read(self, size=-1):
+        end = len(self.buffer)
+        if size is not None and size >= 0:
+            end = min(end, self.position + size)
+        chunk = bytes(self.buffer[self.position : end])
+        self.position = max(self.position, end)
+        return chunk
+
+
+def open_buffer(content):
+    """
+    Opens the metadata `content` as a file object, without copying it
+
+    Args:
+        content (str or bytes or buffer): The metadata content
+
+    Returns:
+        (file object): The file object to read the content from
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    if isinstance(content, bytes):
+        # BytesIO shares the bytes until it's written to
+        return BytesIO(content)
+    return BufferReader(content)
+
+
+def parse_xml(content):
+    """
+    Parses the xml metadata
+
+    Args:
+        content (str or bytes or buffer): The metadata content as a xml string
+
+    Returns:
+        (lxml.etree._ElementTree): The parsed document
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    # Parsed straight from the buffer (including memory-mapped files),
+    # without wrapping it in a file object
+    return etree.fromstring(content).getroottree()
+
+
+def parse_json(content):
+    """
+    Parses the json metadata
+
+    Args:
+        content (str or bytes or buffer): The metadata content as a json string
+
+    Returns:
+        (dict): The decoded metadata
+    """
+    return loads(content)
+
+
+def _element_name(node):
+    """
+    The name of `node` as it is written in the document (with its namespace prefix, if any)
+    """
+    key = (node.tag, node.prefix)
+    if key not in _element_names:
+        local_name = etree.QName(node).localname
+        _element_names[key] = (
+            f"{node.prefix}:{local_name}" if node.prefix else local_name
+        )
+    return _element_names[key]
+
+
+def _attributes(node, parent_nsmap):
+    """
+    The attributes of `node`, including its namespace declarations (the namespaces
+    that aren't inherited from the parent), keyed as they are written in the document
+    """
+    attributes = {}
+    nsmap = node.nsmap
+    if nsmap != parent_nsmap:
+        for prefix, uri in nsmap.items():
+            if parent_nsmap.get(prefix) != uri:
+                attributes[f"@xmlns:{prefix}" if prefix else "@xmlns"] = uri
+    for key, value in node.attrib.items():
+        if key[0] == "{":
+            uri, local_name = key[1:].split("}", 1)
+            if uri == XML_NAMESPACE:
+                prefix = "xml"
+            else:
+                prefix = next(
+                    prefix for prefix, ns in nsmap.items() if prefix and ns == uri
+                )
+            key = f"{prefix}:{local_name}"
+        attributes[f"@{key}"] = value
+    return attributes, nsmap
+
+
+def _element_value(node, parent_nsmap):
+    """
+    Converts `node` to the value `xmltodict` gives it
+    """
+    item, nsmap = _attributes(node, parent_nsmap)
+    data = [node.text] if node.text else []
+    for child in node:
+        # Comments and processing instructions are skipped, but not the text after them
+        if isinstance(child.tag, str):
+            name = _element_name(child)
+            value = _element_value(child, nsmap)
+            if name not in item:
+                item[name] = value
+            elif isinstance(item[name], list):
+                item[name].append(value)
+            else:
+                item[name] = [item[name], value]
+        if child.tail:
+            data.append(child.tail)
+    text = "".join(data).strip() or None
+    if not item:
+        return text
+    # Sometimes the XML values contain attributes. In such a case, the regular value
+    # is used instead of something like: {"@uuid": "26ebb539-...", "#text": "IMAGERY/BASE MAPS/EARTH COVER"}
+    return text or item
+
+
+def _pruned_element_value(node, parent_nsmap, paths):
+    """
+    Converts `node` like `_element_value`, but only with the child elements in `paths`
+    (see `build_path_tree`). The text and attributes of `node` are kept as they are,
+    and it stays a dictionary if it had any child elements, so the values found
+    along the referenced paths are the same as in the full conversion.
+    """
+    item, nsmap = _attributes(node, parent_nsmap)
+    data = [node.text] if node.text else []
+    has_children = False
+    for child in node:
+        if isinstance(child.tag, str):
+            has_children = True
+            name = _element_name(child)
+            if name in paths:
+                child_paths = paths[name]
+                if child_paths is None:
+                    value = _element_value(child, nsmap)
+                else:
+                    value = _pruned_element_value(child, nsmap, child_paths)
+                if name not in item:
+                    item[name] = value
+                elif isinstance(item[name], list):
+                    item[name].append(value)
+                else:
+                    item[name] = [item[name], value]
+        if child.tail:
+            data.append(child.tail)
+    text = "".join(data).strip() or None
+    if not item and not has_children:
+        return text
+    return text or item
+
+
+def build_path_tree(paths):
+    """
+    Builds the tree of keys `xml_to_dict` uses to convert only the referenced fields
+
+    Args:
+        paths (iterable): The referenced field paths, each as a list of keys
+            Example: [['Collection', 'Temporal', 'RangeDateTime'], ['Collection', 'ShortName']]
+
+    Returns:
+        (dict): The nested keys, where None means the whole subtree is kept
+            Example: {'Collection': {'Temporal': {'RangeDateTime': None}, 'ShortName': None}}
+    """
+    tree = {}
+    for path in paths:
+        node = tree
+        for key in path[:-1]:
+            if key in node and node[key] is None:
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[path[-1]] = None
+    return tree
+
+
+def xml_to_dict(doc, path_tree=None):
+    """
+    Converts the parsed xml metadata to the dictionary the custom checks run on.
+    It is the same as `xmltodict.parse` gives, with the values that have
+    attributes replaced by their text.
+
+    Namespace declarations are read from the parsed document, so the ones that
+    redeclare a namespace already declared by a parent aren't included.
+
+    Args:
+        doc (lxml.etree._ElementTree): The parsed document
+        path_tree (dict): If given, only the fields in it are converted (see `build_path_tree`);
+            the subtrees that aren't referenced are skipped
+
+    Returns:
+        (dict): The metadata as a dictionary
+    """
+    root = doc.getroot()
+    name = _element_name(root)
+    if path_tree is not None:
+        paths = path_tree.get(name, {})
+        if paths is not None:
+            return {name: _pruned_element_value(root, {}, paths)}
+    return {name: _element_value(root, {})}
@@ -0,0 +1,172 @@
+class _PathNode:
+    """
+    The fields that share the keys leading to a node of the path tree
+    """
+
+    def __init__(self, accessors, targets, depth, nodes):
+        # All the fields under this node
+        self.targets = targets
+        # The fields that end here
+        self.ends = tuple(
+            target for target in targets if len(accessors[target].keys) == depth
+        )
+        # The fields that pick one element of a list here, by their query parameters
+        self.queries = tuple(
+            (target, accessors[target])
+            for target in targets
+            if len(accessors[target].keys) == depth + 1
+            and accessors[target].query_params
+        )
+        children = {}
+        for target in targets:
+            keys = accessors[target].keys
+            if len(keys) > depth:
+                children.setdefault(keys[depth], []).append(target)
+        self.children = tuple(
+            (key, _PathNode.build(accessors, tuple(group), depth + 1, nodes))
+            for key, group in children.items()
+        )
+        # When the value here is a list, each of its elements is looked into
+        # for the other fields
+        self.element = None
+        if self.ends or self.queries:
+            skipped = set(self.ends) | {target for target, _ in self.queries}
+            self.element = _PathNode.build(
+                accessors,
+                tuple(target for target in targets if target not in skipped),
+                depth,
+                nodes,
+            )
+        elif targets:
+            self.element = self
+
+    @staticmethod
+    def build(accessors, targets, depth, nodes):
+        """
+        Builds the node for `targets` at `depth`, reusing the identical ones
+        """
+        if not targets:
+            return None
+        key = (targets, depth)
+        if key not in nodes:
+            nodes[key] = _PathNode(accessors, targets, depth, nodes)
+        return nodes[key]
+
+
+class PathIndex:
+    """
+    Finds the values of a fixed set of fields in each record with one traversal
+    of the record, instead of walking it from the root for every field of every
+    rule. The fields that share a prefix (eg: 'Collection/Platforms/Platform')
+    are looked up together.
+
+    The values are the same as `FieldAccessor.values` gives, including the None
+    placeholders for the missing fields that keep the values of related fields
+    aligned, and the errors it raises.
+    """
+
+    def __init__(self, accessors):
+        """
+        Args:
+            accessors (iterable of FieldAccessor): The fields
+        """
+        self.accessors = []
+        self.targets = {}
+        for accessor in accessors:
+            if accessor.key not in self.targets:
+                self.targets[accessor.key] = len(self.accessors)
+                self.accessors.append(accessor)
+        self.root = _PathNode.build(
+            self.accessors, tuple(range(len(self.accessors))), 0, {}
+        )
+
+    def index(self, content_to_validate):
+        """
+        Finds the values of all the fields in `content_to_validate`
+
+        Args:
+            content_to_validate (dict): The metadata content
+
+        Returns:
+            (RecordIndex): The values of the fields in the record
+        """
+        values = [[] for _ in self.accessors]
+        errors = {}
+        if self.root:
+            PathIndex._visit(content_to_validate, self.root, values, errors)
+        return RecordIndex(self, content_to_validate, values, errors)
+
+    @staticmethod
+    def _add(targets, value, values, errors):
+        # Once reading a field failed, it has no values
+        for target in targets:
+            if target not in errors:
+                values[target].append(value)
+
+    @staticmethod
+    def _visit(subset_of_metadata_content, node, values, errors):
+        """
+        Adds the values of the fields under `node` found in
+        `subset_of_metadata_content`, the same way
+        `FieldAccessor.values` does for each of them
+        """
+        add = PathIndex._add
+        if node.ends:
+            add(node.ends, subset_of_metadata_content, values, errors)
+        for key, child in node.children:
+            try:
+                root_content = subset_of_metadata_content[key]
+            except KeyError:
+                # Placeholders, for the GCMD keywords check
+                add(child.targets, None, values, errors)
+                continue
+            except IndexError:
+                add(child.targets, subset_of_metadata_content, values, errors)
+                continue
+            except Exception as e:
+                # Raised when the value of the field is read
+                for target in child.targets:
+                    errors.setdefault(target, e)
+                continue
+            if isinstance(root_content, dict):
+                PathIndex._visit(root_content, child, values, errors)
+            elif isinstance(root_content, list):
+                if child.ends:
+                    add(child.ends, root_content, values, errors)
+                for target, accessor in child.queries:
+                    add((target,), accessor.select(root_content), values, errors)
+                if child.element:
+                    for each in root_content:
+                        PathIndex._visit(each, child.element, values, errors)
+            elif isinstance(root_content, (str, int, float)):
+                add(child.targets, root_content, values, errors)
+
+
+class RecordIndex:
+    """
+    The values of the fields of a `PathIndex` in one record
+    """
+
+    def __init__(self, path_index, content_to_validate, values, errors):
+        self.path_index = path_index
+        self.content_to_validate = content_to_validate
+        self.values = values
+        self.errors = errors
+
+    def get(self, accessor):
+        """
+        Gets the values of the field, like `FieldAccessor.values`.
+        The fields that weren't indexed are looked up in the record.
+
+        Args:
+            accessor (FieldAccessor): The field
+
+        Returns:
+            (list): The values of the field
+        """
+        target = self.path_index.targets.get(accessor.key)
+        if target is None:
+            return accessor.values(self.content_to_validate)
+        if target in self.errors:
+            raise self.errors[target]
+        return self.values[target]
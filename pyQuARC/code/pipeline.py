@@ -0,0 +1,101 @@
+import queue
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .constants import DEFAULT_DOWNLOAD_WORKERS
+
+
+class Pipeline:
+    """
+    Runs a producer stage (eg: downloads) concurrently and hands the results
+    to the consumer in input order through a bounded queue
+    """
+
+    # Marks the end of the input in the queue
+    _DONE = object()
+
+    def __init__(self, producer, workers=DEFAULT_DOWNLOAD_WORKERS, queue_size=None):
+        """
+        Args:
+            producer (func): The function that is run on every input item
+            workers (int): The number of concurrent producer threads
+            queue_size (int): The maximum number of produced (or in progress) items
+                waiting for the consumer. Defaults to twice the number of workers.
+        """
+        self.producer = producer
+        self.workers = max(1, workers)
+        self.queue_size = queue_size or 2 * self.workers
+
+    @staticmethod
+    def _put(pending, entry, stop):
+        """
+        Puts `entry` in the `pending` queue unless the consumer has stopped
+
+        Returns:
+            (bool): True if the entry was queued, False otherwise
+        """
+        while not stop.is_set():
+            try:
+                pending.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(self, items, executor, pending, stop):
+        """
+        Submits every item to the `executor` and puts the futures in `pending`
+
+        Blocks while `pending` is full, so the producers never run too far ahead
+        of the consumer
+        """
+        try:
+            for item in items:
+                future = executor.submit(self.producer, item)
+                if not Pipeline._put(pending, (item, future), stop):
+                    future.cancel()
+                    return
+            Pipeline._put(pending, (Pipeline._DONE, None), stop)
+        except Exception as e:
+            # Errors while reading the input (eg: a failed query) reach the consumer
+            Pipeline._put(pending, (Pipeline._DONE, e), stop)
+
+    def run(self, items):
+        """
+        Runs the producer on all the `items`
+
+        Args:
+            items (iterable): The input items
+
+        Yields:
+            (tuple): (item, result of the producer for the item) in input order
+        """
+        pending = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            feeder = threading.Thread(
+                target=self._feed,
+                args=(items, executor, pending, stop),
+                daemon=True,
+            )
+            feeder.start()
+            try:
+                while True:
+                    item, future = pending.get()
+                    if item is Pipeline._DONE:
+                        if future is not None:
+                            raise future
+                        break
+                    yield item, future.result()
+            finally:
+                stop.set()
+                # Drop the work that the consumer will never ask for
+                while True:
+                    try:
+                        _, future = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    if hasattr(future, "cancel"):
+                        future.cancel()
+                feeder.join()
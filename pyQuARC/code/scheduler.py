@@ -96,3 +96,100 @@ class Scheduler:
             ordered_rules.extend(self._find_rule_ids_based_on_check_id(dependency))
 
         return ordered_rules
+
+    def dependency_graph(self, rule_ids):
+        """
+        Creates the dependency graph of `rule_ids`: for each rule, the rules whose
+        results it reads, so it can only run once they are done. The rules that
+        aren't in `rule_ids` (eg: the ones that don't apply to the metadata format)
+        are never run, so they aren't waited for.
+
+        Args:
+            rule_ids (list): The rules to run, as ordered by `order_rules`
+
+        Returns:
+            (dict): The rules each rule depends on, in the form:
+            {
+                "rule_id": ["dependency_rule_id", ...],
+                ...
+            }
+        """
+        included = set(rule_ids)
+        graph = {}
+        for rule_id in rule_ids:
+            graph[rule_id] = []
+            rule = self.rule_mapping.get(rule_id)
+            check = self.check_list.get(rule.get("check_id") or rule_id)
+            try:
+                dependencies = self.get_all_dependencies(rule, check)
+            except Exception:
+                # The rule can't be run anyway, the error is reported when it is
+                continue
+            for dependency in dependencies:
+                if dependency[0] in included and dependency[0] != rule_id:
+                    Scheduler.append_if_not_exist(dependency[0], graph[rule_id])
+        return graph
+
+
+class Readiness:
+    """
+    Tracks which rules of a dependency graph (see `Scheduler.dependency_graph`)
+    are ready to run, as the rules they depend on are done. It is built once for
+    a graph, and `copy` gives a fresh one for every run.
+    """
+
+    def __init__(self, graph):
+        """
+        Args:
+            graph (dict): The rules each rule depends on
+        """
+        self.waiting_for = {
+            rule_id: len(dependencies) for rule_id, dependencies in graph.items()
+        }
+        self.dependents = {}
+        for rule_id, dependencies in graph.items():
+            for dependency in dependencies:
+                self.dependents.setdefault(dependency, []).append(rule_id)
+        self.independent = tuple(
+            rule_id for rule_id, count in self.waiting_for.items() if not count
+        )
+
+    def copy(self):
+        """
+        Gets a Readiness where no rule is done yet. Only the counts of the rules
+        each rule still waits for are copied, the rest is shared.
+
+        Returns:
+            (Readiness): The fresh copy
+        """
+        readiness = Readiness.__new__(Readiness)
+        readiness.waiting_for = dict(self.waiting_for)
+        readiness.dependents = self.dependents
+        readiness.independent = self.independent
+        return readiness
+
+    def ready(self):
+        """
+        Gets the rules that don't depend on any other rule
+
+        Returns:
+            (list): The rules that can run right away, in the order of the graph
+        """
+        return list(self.independent)
+
+    def done(self, rule_id):
+        """
+        Marks `rule_id` as done
+
+        Args:
+            rule_id (str): The rule whose results are final
+
+        Returns:
+            (list): The rules that became ready because of it
+        """
+        ready = []
+        for dependent in self.dependents.get(rule_id, []):
+            self.waiting_for[dependent] -= 1
+            if not self.waiting_for[dependent]:
+                ready.append(dependent)
+        return ready
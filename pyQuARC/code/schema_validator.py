@@ -1,13 +1,21 @@
+import copy
 import json
 import os
 import re
+import threading
 
 from io import BytesIO
 from jsonschema import Draft7Validator, draft7_format_checker, RefResolver
 from lxml import etree
 from urllib.request import pathname2url
 
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
 from .constants import ECHO10_C, SCHEMA_PATHS, UMM_C
+from .parser import CONTENT_TYPES, parse_json, parse_xml
 
 
 class SchemaValidator:
@@ -16,11 +24,34 @@ class SchemaValidator:
     """
 
     PATH_SEPARATOR = "/"
+    XSD_NAMESPACE = "http://www.w3.org/2001/XMLSchema"
+
+    # To read the xml validator's error messages
+    NAMESPACE = re.compile(r"\{http[^}]*\}")
+    ELEMENT = re.compile(r"Element\s'(.*)':")
+    ELEMENT_MESSAGE = re.compile(r"Element\s'.+':\s(\[.*\])?(.*)")
+    # {(tag, prefix): the element name in paths}
+    _step_names = {}
+
+    # The compiled xml schemas, shared by all the validators in the process
+    # {schema_path: {"files": ..., "signature": ..., "schema": ..., "lock": ...}}
+    _xml_schemas = {}
+    _xml_schemas_lock = threading.Lock()
+
+    # The json schemas, read once per process
+    # {metadata_format: (schema, referenced schemas by id)}
+    _json_schemas = {}
+    _json_schemas_lock = threading.Lock()
+
+    # The json schemas compiled to python code (if `fastjsonschema` is installed),
+    # shared by all the validators in the process {metadata_format: validate function}
+    _fast_json_validators = {}
 
     def __init__(
         self,
         check_messages,
         metadata_format=ECHO10_C,
+        fast_json=True,
     ):
         """
         Args:
@@ -29,10 +60,17 @@ class SchemaValidator:
             validation_paths (list of str): The path of the fields in the
                 metadata that need to be validated. In the form
                 ['Collection/StartDate', ...].
+            fast_json (bool): If True and `fastjsonschema` is installed, json metadata
+                is first validated with the schema compiled to python code, and only the
+                invalid metadata goes through `jsonschema` to get the error details
         """
         self.metadata_format = metadata_format
+        self.fast_json_validator = None
         if metadata_format.startswith("umm-"):
             self.validator_func = self.run_json_validator
+            self.json_validator = self._build_json_validator()
+            if fast_json and fastjsonschema:
+                self.fast_json_validator = self._get_fast_json_validator()
         else:
             self.validator_func = self.run_xml_validator
         self.check_messages = check_messages
@@ -57,6 +95,80 @@ class SchemaValidator:
         schema = etree.XMLSchema(xmlschema_doc)
         return schema
 
+    @staticmethod
+    def _xml_schema_files(schema_path):
+        """
+        Lists the files that the compiled xml schema depends on: the schema itself,
+        the catalog and the schemas it includes or imports
+
+        Args:
+            schema_path (str): The path to the xml schema file
+
+        Returns:
+            (list): The file paths
+        """
+        locations = etree.parse(schema_path).xpath(
+            "//xs:include/@schemaLocation | //xs:import/@schemaLocation",
+            namespaces={"xs": SchemaValidator.XSD_NAMESPACE},
+        )
+        directory = os.path.dirname(schema_path)
+        return [
+            schema_path,
+            SCHEMA_PATHS["catalog"],
+            *(os.path.join(directory, location) for location in locations),
+        ]
+
+    @staticmethod
+    def _signature(file_paths):
+        """
+        The modification times of `file_paths`, to tell if any of them changed
+        """
+        signature = []
+        for file_path in file_paths:
+            try:
+                signature.append(os.stat(file_path).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def get_xml_schema(self):
+        """
+        Gets the compiled xml schema of the metadata format. It is compiled once
+        and reused by all the validators in the process, until any of the schema
+        files changes on disk.
+
+        Returns:
+            (tuple): (The compiled schema, The lock to hold while validating with it)
+        """
+        schema_path = SCHEMA_PATHS[f"{self.metadata_format}_schema"]
+        with SchemaValidator._xml_schemas_lock:
+            cached = SchemaValidator._xml_schemas.get(schema_path)
+            if not cached or cached["signature"] != SchemaValidator._signature(
+                cached["files"]
+            ):
+                files = SchemaValidator._xml_schema_files(schema_path)
+                # Taken before compiling, so that a change while compiling
+                # is picked up the next time
+                signature = SchemaValidator._signature(files)
+                cached = {
+                    "files": files,
+                    "signature": signature,
+                    "schema": self.read_xml_schema(),
+                    # An XMLSchema object keeps the error log of its last validation,
+                    # so it can't be used by multiple threads at once
+                    "lock": threading.Lock(),
+                }
+                SchemaValidator._xml_schemas[schema_path] = cached
+        return cached["schema"], cached["lock"]
+
+    @staticmethod
+    def clear_xml_schema_cache():
+        """
+        Drops the compiled xml schemas, so that they are read again from disk
+        """
+        with SchemaValidator._xml_schemas_lock:
+            SchemaValidator._xml_schemas.clear()
+
     def read_json_schema(self):
         """
         Reads the json schema file
@@ -65,37 +177,211 @@ class SchemaValidator:
             schema = json.load(schema_file)
         return schema
 
-    def run_json_validator(self, content_to_validate):
+    def _read_json_schemas(self):
         """
-        Validate passed content based on the schema and return any errors
-        Args:
-            content_to_validate (str): The metadata content as a json string
+        Reads the json schema of the metadata format and the schemas it references.
+        They are only read once per process.
+
         Returns:
-            (dict) A dictionary that gives the validity of the schema and errors if they exist
+            (tuple): (The schema, The referenced schemas by their ids)
         """
-        schema = self.read_json_schema()
-        schema_store = {}
+        with SchemaValidator._json_schemas_lock:
+            if self.metadata_format not in SchemaValidator._json_schemas:
+                schema = self.read_json_schema()
+                schema_store = {}
 
-        if self.metadata_format == UMM_C:
-            with open(SCHEMA_PATHS["umm-cmn-json-schema"]) as schema_file:
-                schema_base = json.load(schema_file)
+                if self.metadata_format == UMM_C:
+                    with open(SCHEMA_PATHS["umm-cmn-json-schema"]) as schema_file:
+                        schema_base = json.load(schema_file)
 
-            # workaround to read local referenced schema file (only supports uri)
-            schema_store = {
-                schema_base.get("$id", "/umm-cmn-json-schema.json"): schema_base,
-                schema_base.get("$id", "umm-cmn-json-schema.json"): schema_base,
-            }
+                    # workaround to read local referenced schema file (only supports uri)
+                    schema_store = {
+                        schema_base.get("$id", "/umm-cmn-json-schema.json"): schema_base,
+                        schema_base.get("$id", "umm-cmn-json-schema.json"): schema_base,
+                    }
+                SchemaValidator._json_schemas[self.metadata_format] = (
+                    schema,
+                    schema_store,
+                )
+            return SchemaValidator._json_schemas[self.metadata_format]
 
-        errors = {}
+    def _build_json_validator(self):
+        """
+        Builds the json schema validator of the metadata format, to be reused
+        for all the metadata validated by this instance.
+        The ref resolver keeps state while resolving, so it isn't shared between instances.
 
+        Returns:
+            (Draft7Validator): The validator
+        """
+        schema, schema_store = self._read_json_schemas()
         resolver = RefResolver.from_schema(schema, store=schema_store)
-
-        validator = Draft7Validator(
+        return Draft7Validator(
             schema, format_checker=draft7_format_checker, resolver=resolver
         )
 
+    @staticmethod
+    def _inline_refs(schema, schema_store):
+        """
+        Embeds the schemas referenced by `schema` in its definitions,
+        so that all the `$ref`s are local to the schema
+
+        Args:
+            schema (dict): The json schema
+            schema_store (dict): The referenced schemas by their ids
+
+        Returns:
+            (dict): A self contained copy of the schema
+        """
+        inlined = copy.deepcopy(schema)
+        # {referenced schema id: json pointer to where it's embedded}
+        pointers = {}
+        embedded = {}
+
+        def embed(schema_id):
+            if schema_id not in pointers:
+                key = schema_id.replace("~", "~0").replace("/", "~1")
+                pointers[schema_id] = f"/definitions/{key}"
+                document = copy.deepcopy(schema_store[schema_id])
+                document.pop("$schema", None)
+                document.pop("$id", None)
+                embedded[schema_id] = document
+                rewrite(document, pointers[schema_id])
+            return pointers[schema_id]
+
+        def rewrite(node, base_pointer):
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if key == "$ref" and isinstance(value, str):
+                        schema_id, _, fragment = value.partition("#")
+                        if schema_id:
+                            node[key] = f"#{embed(schema_id)}{fragment}"
+                        elif base_pointer:
+                            node[key] = f"#{base_pointer}{fragment}"
+                    else:
+                        rewrite(value, base_pointer)
+            elif isinstance(node, list):
+                for item in node:
+                    rewrite(item, base_pointer)
+
+        rewrite(inlined, "")
+        definitions = inlined.setdefault("definitions", {})
+        for schema_id, document in embedded.items():
+            definitions[schema_id] = document
+        return inlined
+
+    @staticmethod
+    def _escape_class_dollars(pattern):
+        """
+        Escapes the `$` characters inside the character classes of a regex pattern.
+        It doesn't change what the pattern matches, but `fastjsonschema` can't
+        compile unescaped ones (eg: [#$%]).
+        """
+        escaped = []
+        in_class = escaping = False
+        # Where the characters of the current class start. A `]` right there is a
+        # character of the class (eg: []$] or [^]$]), not its end.
+        class_start = 0
+        for character in pattern:
+            if escaping:
+                escaping = False
+            elif character == "\\":
+                escaping = True
+            elif not in_class:
+                if character == "[":
+                    in_class = True
+                    class_start = len(escaped) + 1
+            elif character == "^" and len(escaped) == class_start:
+                class_start += 1
+            elif character == "]" and len(escaped) > class_start:
+                in_class = False
+            elif character == "$":
+                escaped.append("\\")
+            escaped.append(character)
+        return "".join(escaped)
+
+    @staticmethod
+    def _fast_json_schema(node, formats):
+        """
+        Adapts the json schema for `fastjsonschema`, and collects the names
+        of the string formats it uses
+        """
+        if isinstance(node, dict):
+            if isinstance(node.get("format"), str):
+                formats.add(node["format"])
+            if isinstance(node.get("pattern"), str):
+                node["pattern"] = SchemaValidator._escape_class_dollars(node["pattern"])
+            if isinstance(node.get("patternProperties"), dict):
+                node["patternProperties"] = {
+                    SchemaValidator._escape_class_dollars(pattern): value
+                    for pattern, value in node["patternProperties"].items()
+                }
+            for value in node.values():
+                SchemaValidator._fast_json_schema(value, formats)
+        elif isinstance(node, list):
+            for item in node:
+                SchemaValidator._fast_json_schema(item, formats)
+
+    def _get_fast_json_validator(self):
+        """
+        Gets the json schema of the metadata format compiled to python code.
+        It is compiled once and shared by all the validators in the process.
+
+        Returns:
+            (function): Raises `fastjsonschema.JsonSchemaException` if the metadata
+                is invalid. None if the schema can't be compiled.
+        """
+        schema, schema_store = self._read_json_schemas()
+        with SchemaValidator._json_schemas_lock:
+            if self.metadata_format not in SchemaValidator._fast_json_validators:
+                try:
+                    inlined = SchemaValidator._inline_refs(schema, schema_store)
+                    format_names = set()
+                    SchemaValidator._fast_json_schema(inlined, format_names)
+                    # The same format checks as jsonschema, so that both agree
+                    formats = {
+                        name: lambda value, name=name: draft7_format_checker.conforms(
+                            value, name
+                        )
+                        for name in format_names
+                    }
+                    validator = fastjsonschema.compile(
+                        inlined, formats=formats, use_default=False
+                    )
+                except Exception:
+                    # Besides `fastjsonschema.JsonSchemaDefinitionException`,
+                    # generating or compiling the code may fail in other ways
+                    # (eg: a missing $ref, or a RecursionError). The metadata
+                    # is then validated with jsonschema only.
+                    validator = None
+                SchemaValidator._fast_json_validators[self.metadata_format] = validator
+            return SchemaValidator._fast_json_validators[self.metadata_format]
+
+    def run_json_validator(self, content_to_validate):
+        """
+        Validate passed content based on the schema and return any errors
+        Args:
+            content_to_validate (str or dict): The metadata content as a json string,
+                or already decoded
+        Returns:
+            (dict) A dictionary that gives the validity of the schema and errors if they exist
+        """
+        json_metadata = content_to_validate
+        if isinstance(content_to_validate, CONTENT_TYPES):
+            json_metadata = parse_json(content_to_validate)
+
+        errors = {}
+
+        if self.fast_json_validator:
+            try:
+                self.fast_json_validator(json_metadata)
+                return errors
+            except fastjsonschema.JsonSchemaException:
+                # The error details come from jsonschema
+                pass
+
         for error in sorted(
-            validator.iter_errors(json.loads(content_to_validate)), key=str
+            self.json_validator.iter_errors(json_metadata), key=str
         ):
             field = SchemaValidator.PATH_SEPARATOR.join(
                 [str(x) for x in list(error.path)]
@@ -118,31 +404,104 @@ class SchemaValidator:
         return errors
 
     @staticmethod
-    def _build_errors(error_log, paths):
+    def _step_name(node):
+        """
+        The name of `node` as it appears in the path given by `getpath`
+        """
+        step_names = SchemaValidator._step_names
+        key = (node.tag, node.prefix)
+        if key not in step_names:
+            qualified_name = etree.QName(node)
+            if node.prefix:
+                step_names[key] = f"{node.prefix}:{qualified_name.localname}"
+            elif qualified_name.namespace:
+                # Elements in a default namespace have no name in the path
+                step_names[key] = "*"
+            else:
+                step_names[key] = node.tag
+        return step_names[key]
+
+    @staticmethod
+    def _leaf_index(doc):
+        """
+        Indexes the leaf fields (the ones with a value) in the document by the names
+        of the elements along their paths, in a single traversal
+
+        Args:
+            doc (lxml.etree._ElementTree): The parsed document
+
+        Returns:
+            (dict): The leaf elements by element name, eg: {"Platform": [<Element ShortName>, ...]}
+        """
+        index = {}
+        ancestor_names = {}
+        for node in doc.getroot().iter(etree.Element):
+            names = ancestor_names.get(node.getparent(), frozenset()) | {
+                SchemaValidator._step_name(node)
+            }
+            if len(node):
+                ancestor_names[node] = names
+            elif node.text:
+                for name in names:
+                    index.setdefault(name, []).append(node)
+        return index
+
+    @staticmethod
+    def _field_path(field_name, index, doc):
+        """
+        Maps a field name given by the XML validator to the full path of the field,
+        if the field name is part of the path of exactly one leaf field
+
+        Args:
+            field_name (str): The field name
+            index (dict): The leaf elements by element name
+            doc (lxml.etree._ElementTree): The parsed document
+
+        Returns:
+            (str): The full path if there is a single match, the field name otherwise
+        """
+        leaves = set()
+        # The field name is matched as part of the element names, same as it
+        # would be as part of the full paths
+        for name, nodes in index.items():
+            if field_name in name:
+                leaves.update(nodes)
+                if len(leaves) > 1:
+                    return field_name
+        return doc.getpath(leaves.pop())[1:] if leaves else field_name
+
+    @staticmethod
+    def _build_errors(error_log, doc):
         """
         Cleans up the error log given by the XML Validator and builds an error object in
         the format accepted by our program
 
         Args:
-            error_log (str): The error log as output by the xml validator
-            paths (list): All available paths in the document file
+            error_log (lxml.etree._ListErrorLog): The error log of the xml validator
+            doc (lxml.etree._ElementTree): The parsed document
 
         Returns:
             (dict): The formatted error dictionary
         """
         errors = {}
-        lines = error_log.splitlines()
-        for line in lines:
+        # The validator only gives the field name, not full path
+        # The paths in the document are indexed to map it to the full path
+        index = SchemaValidator._leaf_index(doc)
+        field_paths = {}
+        for entry in error_log:
             # For DIF, because the namespace is specified in the metadata file, lxml library
-            # provides field name concatenated with the namespace,
-            # the following 3 lines of code removes the namespace
-            namespaces = re.findall("(\{http[^}]*\})", line)
-            for namespace in namespaces:
-                line = line.replace(namespace, "")
-            field_name = re.search("Element\s'(.*)':", line)[1]
-            field_paths = [abs_path for abs_path in paths if field_name in abs_path]
-            field_name = field_paths[0] if len(field_paths) == 1 else field_name
-            message = re.search("Element\s'.+':\s(\[.*\])?(.*)", line)[2].strip()
+            # provides field name concatenated with the namespace, this removes the namespace
+            message = SchemaValidator.NAMESPACE.sub("", entry.message)
+            if element := SchemaValidator.ELEMENT.search(message):
+                field_name = element[1]
+                if field_name not in field_paths:
+                    field_paths[field_name] = SchemaValidator._field_path(
+                        field_name, index, doc
+                    )
+                field_name = field_paths[field_name]
+                message = SchemaValidator.ELEMENT_MESSAGE.search(message)[2].strip()
+            else:
+                field_name = SchemaValidator.NAMESPACE.sub("", entry.path or "")[1:]
             errors.setdefault(field_name, {})["schema"] = {
                 "message": [f"Error: {message}"],
                 "valid": False,
@@ -154,39 +513,52 @@ class SchemaValidator:
         Validate passed content based on the schema and return any errors
 
         Args:
-            content_to_validate (bytes): The metadata content as a xml string
+            content_to_validate (bytes or buffer or lxml.etree._ElementTree): The metadata content
+                as a xml string, or the already parsed document
 
         Returns:
             (dict) A dictionary that gives the validity of the schema and errors if they exist
 
         """
-        schema = self.read_xml_schema()
+        schema, schema_lock = self.get_xml_schema()
 
-        xml_content = content_to_validate
-        doc = etree.parse(BytesIO(xml_content))
+        doc = content_to_validate
+        if isinstance(content_to_validate, CONTENT_TYPES):
+            doc = parse_xml(content_to_validate)
 
-        # Getting a list of available paths in the document
-        # The validator only gives the field name, not full path
-        # Getting this to map it to the full path later
-        paths = []
-        for node in doc.xpath("//*"):
-            if not node.getchildren() and node.text:
-                paths.append(doc.getpath(node)[1:])
+        with schema_lock:
+            if schema.validate(doc):
+                return {}
+            error_log = schema.error_log
+        return SchemaValidator._build_errors(error_log, doc)
 
-        errors = {}
+    def parse_and_validate(self, metadata):
+        """
+        Parses the metadata and runs schema validation on it
 
-        try:
-            schema.assertValid(doc)
-        except etree.DocumentInvalid as err:
-            errors = SchemaValidator._build_errors(str(err.error_log), paths)
-        return errors
+        Args:
+            metadata (str or bytes or buffer or dict): The original metadata (either
+                xml or json string), or the already decoded json
+
+        Returns:
+            (tuple): (The parsed document (lxml tree or decoded json),
+                Result of the validation from xml and json schema validators)
+        """
+        if self.metadata_format.startswith("umm-"):
+            document = metadata
+            if isinstance(metadata, CONTENT_TYPES):
+                document = parse_json(metadata)
+            return document, self.run_json_validator(document)
+        document = parse_xml(metadata)
+        return document, self.run_xml_validator(document)
 
     def run(self, metadata):
         """
         Runs schema validation on the metadata
 
         Args:
-            metadata (str): The original metadata (either xml or json string)
+            metadata (str): The original metadata (either xml or json string),
+                or the already parsed document
 
         Returns:
             (dict): Result of the validation from xml and json schema validators
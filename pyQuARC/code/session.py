@@ -0,0 +1,313 @@
+import os
+import random
+import threading
+import time
+
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+
+from .constants import (
+    BACKOFF_FACTOR,
+    DEFAULT_NETWORK_WORKERS,
+    DEFAULT_POOL_SIZE,
+    MAX_BACKOFF,
+    MAX_RETRIES,
+    MAX_RETRY_TIME,
+    REQUEST_TIMEOUT,
+)
+
+_lock = threading.Lock()
+_state = {
+    "scheduler": None,
+    "scheduler_settings": None,
+    "executor": None,
+    "executor_pid": None,
+    "network_workers": DEFAULT_NETWORK_WORKERS,
+}
+# The sessions of each thread
+_local = threading.local()
+
+
+def _create_session(cookies=True):
+    """
+    Creates a session that keeps the connections to up to `DEFAULT_POOL_SIZE`
+    hosts alive. Without `cookies`, it neither stores nor sends any.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=DEFAULT_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not cookies:
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def _thread_session(name, cookies=True):
+    """
+    Gets the session `name` of the current thread, creating it the first time
+    """
+    pid = os.getpid()
+    session, session_pid = getattr(_local, name, (None, None))
+    # A forked worker process can't share the connections of its parent
+    if session is None or session_pid != pid:
+        session = _create_session(cookies=cookies)
+        setattr(_local, name, (session, pid))
+    return session
+
+
+def get_session():
+    """
+    Gets the HTTP session for the requests to CMR. `requests.Session` isn't
+    guaranteed to be thread-safe, so every thread has its own, and the
+    connections (and their TCP and TLS handshakes) are reused between the
+    requests of the thread.
+
+    Returns:
+        (requests.Session): The session of the current thread
+    """
+    return _thread_session("session")
+
+
+def get_external_session():
+    """
+    Gets the HTTP session for the requests to any other host (eg: the URLs
+    in the metadata). Like `get_session`, every thread has its own. It doesn't
+    keep cookies, so none from CMR or from another host is sent along.
+
+    Returns:
+        (requests.Session): The session of the current thread
+    """
+    return _thread_session("external_session", cookies=False)
+
+
+def get_executor():
+    """
+    Gets the executor shared by everything in this process that waits on the
+    network (eg: the URL checks), so that its threads are started once
+    instead of for every check
+
+    Returns:
+        (concurrent.futures.ThreadPoolExecutor): The shared executor
+    """
+    pid = os.getpid()
+    # A forked worker process doesn't have the threads of its parent
+    if _state["executor"] is None or _state["executor_pid"] != pid:
+        with _lock:
+            if _state["executor"] is None or _state["executor_pid"] != pid:
+                _state["executor"] = ThreadPoolExecutor(
+                    max_workers=_state["network_workers"],
+                    thread_name_prefix="pyquarc-network",
+                )
+                _state["executor_pid"] = pid
+    return _state["executor"]
+
+
+def configure_executor(network_workers):
+    """
+    Sets the number of threads of the shared executor
+
+    Args:
+        network_workers (int): The number of checks that make requests
+            that can run at the same time
+    """
+    with _lock:
+        if (
+            network_workers == _state["network_workers"]
+            and _state["executor"] is not None
+        ):
+            return
+        _state["network_workers"] = network_workers
+        # Not shut down, since a running validation may still submit to it.
+        # Its threads finish the checks they were given, and exit once it's
+        # not used anymore.
+        _state["executor"] = None
+
+
+class TokenBucket:
+    """
+    Rate limiter that allows `rate` requests per second on average,
+    with bursts of up to `capacity` requests
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RequestScheduler:
+    """
+    Sends requests through the HTTP session of the calling thread. Retries the
+    ones that fail because of throttling, server errors or timeouts with a
+    jittered exponential backoff (or as long as the `Retry-After` header says),
+    for at most `max_retry_time` seconds, and optionally limits the rate of
+    requests per host.
+    """
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        max_retries=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        max_backoff=MAX_BACKOFF,
+        rate_limit=None,
+        max_retry_time=MAX_RETRY_TIME,
+    ):
+        """
+        Args:
+            max_retries (int): The number of retries before giving up
+            backoff_factor (float): The base (in seconds) of the exponential backoff
+            max_backoff (float): The longest wait (in seconds) between two retries
+            max_retry_time (float): The time (in seconds) after the first attempt
+                past which a request isn't retried anymore
+            rate_limit (float): The maximum number of requests per second per host.
+                If None, the rate is not limited.
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rate_limit = rate_limit
+        self.max_retry_time = max_retry_time
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_limit)
+            return self._buckets[host]
+
+    def _backoff(self, attempt):
+        """
+        The wait before the retry after `attempt`, with "full jitter" so that
+        concurrent clients don't retry all at the same time
+        """
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff_factor * 2**attempt)
+        )
+
+    def _retry_after(self, response):
+        """
+        Reads the wait (in seconds) asked for by the `Retry-After` header, if any
+        """
+        retry_after = response.headers.get("Retry-After")
+        if not retry_after:
+            return None
+        try:
+            wait = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return None
+            wait = (retry_at - datetime.now(retry_at.tzinfo)).total_seconds()
+        return min(self.max_backoff, max(0, wait))
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends the request, retrying it if needed
+
+        Args:
+            method (str): The HTTP method
+            url (str): The url
+            kwargs: Any keyword arguments accepted by `requests.Session.request`
+
+        Returns:
+            (requests.Response): The last response. It may still be a failed one,
+                if all the retries failed.
+
+        Raises:
+            requests.ConnectionError, requests.Timeout: If the last attempt failed
+                to get a response
+        """
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        deadline = time.monotonic() + self.max_retry_time
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limit:
+                self._bucket(url).acquire()
+            last_attempt = attempt == self.max_retries
+            try:
+                response = get_session().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                wait = self._backoff(attempt)
+                if last_attempt or time.monotonic() + wait > deadline:
+                    raise
+            else:
+                if response.status_code not in RequestScheduler.RETRY_STATUS_CODES:
+                    return response
+                wait = self._retry_after(response)
+                if wait is None:
+                    wait = self._backoff(attempt)
+                if last_attempt or time.monotonic() + wait > deadline:
+                    return response
+            time.sleep(wait)
+
+
+def get_scheduler():
+    """
+    Gets the request scheduler shared by everything in this process
+
+    Returns:
+        (RequestScheduler): The shared scheduler
+    """
+    if _state["scheduler"] is None:
+        with _lock:
+            if _state["scheduler"] is None:
+                _state["scheduler"] = RequestScheduler()
+                _state["scheduler_settings"] = {}
+    return _state["scheduler"]
+
+
+def configure_scheduler(**kwargs):
+    """
+    Replaces the shared request scheduler, unless it already has these settings
+
+    Args:
+        kwargs: Any keyword arguments accepted by `RequestScheduler`
+    """
+    with _lock:
+        if _state["scheduler"] is not None and _state["scheduler_settings"] == kwargs:
+            return
+        _state["scheduler"] = RequestScheduler(**kwargs)
+        _state["scheduler_settings"] = kwargs
+
+
+def cmr_get(url, **kwargs):
+    """
+    GET request to CMR through the shared request scheduler
+    """
+    return get_scheduler().request("GET", url, **kwargs)
+
+
+def cmr_post(url, **kwargs):
+    """
+    POST request to CMR through the shared request scheduler
+    """
+    return get_scheduler().request("POST", url, **kwargs)
@@ -1,6 +1,6 @@
 from .base_validator import BaseValidator
 from .gcmd_validator import GcmdValidator
-from .utils import cmr_request, collection_in_cmr, if_arg, set_cmr_prms
+from .utils import cmr_request, collection_in_cmr, if_arg, network_bound, set_cmr_prms
 
 
 class StringValidator(BaseValidator):
@@ -420,6 +420,7 @@ class StringValidator(BaseValidator):
         return hits > 0
 
     @staticmethod
+    @network_bound
     @if_arg
     def granule_project_short_name_check(
         project_shortname, entry_title=None, short_name=None, version=None
@@ -430,6 +431,7 @@ class StringValidator(BaseValidator):
         return {"valid": validity, "value": project_shortname}
 
     @staticmethod
+    @network_bound
     @if_arg
     def granule_sensor_short_name_check(
         sensor_shortname, entry_title=None, short_name=None, version=None
@@ -440,6 +442,7 @@ class StringValidator(BaseValidator):
         return {"valid": validity, "value": sensor_shortname}
 
     @staticmethod
+    @network_bound
     @if_arg
     def validate_granule_instrument_against_collection(
         instrument_shortname, collection_shortname=None, version=None, dataset_id=None
@@ -467,6 +470,7 @@ class StringValidator(BaseValidator):
         return {"valid": validity, "value": instrument_shortname}
 
     @staticmethod
+    @network_bound
     @if_arg
     def validate_granule_platform_against_collection(
         platform_shortname, collection_shortname=None, version=None, dataset_id=None
@@ -489,6 +493,7 @@ class StringValidator(BaseValidator):
         )
         return {"valid": validity, "value": platform_shortname}
 
+    @network_bound
     @if_arg
     def validate_granule_data_format_against_collection(
         granule_data_format, collection_shortname=None, version=None, dataset_id=None
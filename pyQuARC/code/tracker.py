@@ -13,6 +13,23 @@ class Tracker:
         self.data = Tracker.create_initial_track(
             rule_mapping, rules_override, metadata_format
         )
+        # Once copied, the rows are shared with the copies. These are the rules
+        # whose rows are this tracker's own again (None if none are shared).
+        self._own = None
+
+    def copy(self):
+        """
+        Gets a tracker with the same tracking data, without building it again.
+        The rows of a rule are only copied when they are first updated.
+
+        Returns:
+            (Tracker): The copy, that can be updated independently
+        """
+        tracker = Tracker.__new__(Tracker)
+        tracker.data = dict(self.data)
+        tracker._own = set()
+        self._own = set()
+        return tracker
 
     @staticmethod
     def create_initial_track(rule_mapping, rules_override, metadata_format):
@@ -60,6 +77,9 @@ class Tracker:
             field (str): The field that the rule is applied to
             validity (bool): The validity status of the rule for the field
         """
+        if self._own is not None and rule_id not in self._own:
+            self.data[rule_id] = [dict(row) for row in self.data[rule_id]]
+            self._own.add(rule_id)
         for idx, row in enumerate(self.data[rule_id]):
             if row["field"] == field:
                 self.data[rule_id][idx]["valid"] = validity
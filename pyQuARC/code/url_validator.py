@@ -3,8 +3,9 @@ import requests
 
 from urlextract import URLExtract
 
+from .session import get_external_session
 from .string_validator import StringValidator
-from .utils import get_headers, if_arg
+from .utils import get_headers, if_arg, network_bound
 
 
 class UrlValidator(StringValidator):
@@ -35,6 +36,7 @@ class UrlValidator(StringValidator):
         return starts_with_http
 
     @staticmethod
+    @network_bound
     @if_arg
     def health_and_status_check(text_with_urls):
         """
@@ -48,7 +50,7 @@ class UrlValidator(StringValidator):
         def status_code_from_request(url):
             headers = get_headers()
             # timeout = 10 seconds, to allow for slow but not invalid connections
-            return requests.get(url, headers=headers, timeout=10).status_code
+            return get_external_session().get(url, headers=headers, timeout=10).status_code
 
         results = []
 
@@ -95,6 +97,7 @@ class UrlValidator(StringValidator):
         return {"valid": validity, "value": value}
 
     @staticmethod
+    @network_bound
     @if_arg
     def doi_check(doi):
         """
@@ -1,11 +1,12 @@
 import os
-import requests
 import urllib
 from datetime import datetime
 
 from functools import wraps
+from itertools import islice
 
 from .constants import CMR_URL, DATE_FORMATS
+from .session import cmr_get, get_session
 
 
 def if_arg(func):
@@ -19,6 +20,15 @@ def if_arg(func):
     return run_function_only_if_arg
 
 
+def network_bound(func):
+    """
+    Marks `func` as a check that makes requests (eg: to CMR or to the URLs it checks).
+    The checker runs these on the shared executor, and all the others inline.
+    """
+    func.network_bound = True
+    return func
+
+
 def get_headers():
     token = os.environ.get("AUTH_TOKEN")
     headers = None
@@ -38,7 +48,7 @@ def is_valid_cmr_url(url):
     valid = False
     headers = get_headers()
     try:  # some invalid url throw an exception
-        response = requests.get(
+        response = get_session().get(
             url, headers=headers, timeout=5
         )  # some invalid urls freeze
         valid = response.status_code == 200 and response.headers.get("CMR-Request-Id")
@@ -60,7 +70,11 @@ def set_cmr_prms(params, format="json", type="collections"):
 
 def cmr_request(cmr_prms):
     headers = get_headers()
-    return requests.get(f"{get_cmr_url()}/search/{cmr_prms}", headers=headers).json()
+    response = cmr_get(f"{get_cmr_url()}/search/{cmr_prms}", headers=headers)
+    # A throttled or failed request (after all the retries) raises a clear error
+    # here, instead of failing to decode the response
+    response.raise_for_status()
+    return response.json()
 
 
 def collection_in_cmr(cmr_prms):
@@ -82,3 +96,15 @@ def get_date_time(dt_str):
         except ValueError:
             continue
     return None
+
+
+def batched(iterable, size):
+    """
+    Splits `iterable` into lists of at most `size` items
+
+    Yields:
+        (list): The next batch of items
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -0,0 +1,68 @@
+import sys
+
+from .json_backend import dumps
+
+
+class NdjsonWriter:
+    """
+    Writes validation results as newline delimited JSON (one line per result)
+    to a file or to stdout, as the results come in. The lines are compact json
+    in utf-8 (see `json_backend.dumps`).
+    """
+
+    STDOUT = "-"
+
+    def __init__(self, destination, flush_every=50, append=False):
+        """
+        Args:
+            destination (str): The output file path, or "-" for stdout
+            flush_every (int): The number of lines that are buffered before
+                they are written out and flushed
+            append (bool): If True, adds to the end of an existing output file
+        """
+        self.destination = destination
+        self.flush_every = max(1, flush_every)
+        self.append = append
+        self._buffer = []
+        self._file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def open(self):
+        if self.destination == NdjsonWriter.STDOUT:
+            self._file = sys.stdout
+        else:
+            self._file = open(
+                self.destination, "a" if self.append else "w", encoding="utf-8"
+            )
+
+    def write(self, result):
+        """
+        Adds `result` as a line to the output
+
+        Args:
+            result (dict): The result of a single concept id or file
+        """
+        # Some check values (eg: sets, dates) are not JSON serializable
+        self._buffer.append(dumps(result, default=str))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+        self._file.flush()
+
+    def close(self):
+        if not self._file:
+            return
+        self.flush()
+        if self._file is not sys.stdout:
+            self._file.close()
+        self._file = None
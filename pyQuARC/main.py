@@ -1,23 +1,81 @@
 import argparse
 import os
 import os.path
-import requests
-import xmltodict
 
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import chain
+from lxml import etree
 from tqdm import tqdm
 
 if __name__ == "__main__":
+    from code.batch import (
+        check_concept,
+        check_file,
+        check_record,
+        download,
+        download_bulk,
+        init_worker,
+        iter_corpus,
+        validate_downloaded,
+        validate_file,
+        validate_record,
+    )
     from code.checker import Checker
-    from code.constants import COLOR, ECHO10_C, SUPPORTED_FORMATS
-    from code.downloader import Downloader
-    from code.utils import get_cmr_url, is_valid_cmr_url
+    from code.checkpoint import Checkpoint
+    from code.constants import (
+        COLOR,
+        DEFAULT_DOWNLOAD_WORKERS,
+        DEFAULT_NETWORK_WORKERS,
+        DOWNLOAD_RATE_SHARE,
+        ECHO10_C,
+        SUPPORTED_FORMATS,
+    )
+    from code.downloader import BulkDownloader
+    from code.local_files import expand_file_paths
+    from code.pipeline import Pipeline
+    from code.session import (
+        cmr_get,
+        configure_executor,
+        configure_scheduler,
+    )
+    from code.utils import batched, get_cmr_url, is_valid_cmr_url
     from code.utils import get_headers
+    from code.writer import NdjsonWriter
 else:
+    from .code.batch import (
+        check_concept,
+        check_file,
+        check_record,
+        download,
+        download_bulk,
+        init_worker,
+        iter_corpus,
+        validate_downloaded,
+        validate_file,
+        validate_record,
+    )
     from .code.checker import Checker
-    from .code.constants import COLOR, ECHO10_C, SUPPORTED_FORMATS
-    from .code.downloader import Downloader
-    from .code.utils import get_cmr_url, is_valid_cmr_url
+    from .code.checkpoint import Checkpoint
+    from .code.constants import (
+        COLOR,
+        DEFAULT_DOWNLOAD_WORKERS,
+        DEFAULT_NETWORK_WORKERS,
+        DOWNLOAD_RATE_SHARE,
+        ECHO10_C,
+        SUPPORTED_FORMATS,
+    )
+    from .code.downloader import BulkDownloader
+    from .code.local_files import expand_file_paths
+    from .code.pipeline import Pipeline
+    from .code.session import (
+        cmr_get,
+        configure_executor,
+        configure_scheduler,
+    )
+    from .code.utils import batched, get_cmr_url, is_valid_cmr_url
     from .code.utils import get_headers
+    from .code.writer import NdjsonWriter
 
 ABS_PATH = os.path.abspath(os.path.dirname(__file__))
 END = COLOR["reset"]
@@ -43,23 +101,61 @@ class ARC:
         messages_override=None,
         version=None,
         cmr_host=get_cmr_url(),
+        download_workers=DEFAULT_DOWNLOAD_WORKERS,
+        network_workers=DEFAULT_NETWORK_WORKERS,
+        processes=1,
+        checkpoint=None,
+        resume=False,
+        bulk_size=None,
+        rate_limit=None,
+        cache_dir=None,
+        corpus=False,
     ):
         """
         Args:
             query (str): The query url for the metadata content ids to download
             input_concept_ids (list of str): The list of concept ids to download
             fake (bool): If set to true, used a fake data to perform the validation
-            file_path (str): The absolute path to the sample/test metadata file
+            file_path (str or list of str): The absolute path/s to the sample/test metadata file/s,
+                or to directories of them
             metadata_format (str): The format of the metadata file (echo-c, dif10, echo-g etc)
             checks_override (str): The filepath of the checks_override file
             rules_override (str): The filepath of the rules_override file
             messages_override (str): The filepath of the checks_override file
+            download_workers (int): The number of concurrent downloads feeding the validator.
+                With `processes`, the downloads still run in this process, ahead of
+                the workers that validate.
+            network_workers (int): The number of checks that make requests
+                (eg: the URL checks) that run at the same time, in each process.
+                All the other checks run inline.
+            processes (int): The number of worker processes that validate in parallel.
+                If 1, everything runs in this process.
+            checkpoint (str): The filepath of the checkpoint file that records
+                the concept ids that are already validated
+            resume (bool): If set to true, skips the concept ids that are already
+                recorded (at the same revision) in the `checkpoint` file
+            bulk_size (int): If given, downloads this many records (at most 2000) with
+                each CMR request, instead of one request per concept id.
+                Only the latest revisions can be downloaded in bulk.
+            rate_limit (float): The maximum number of requests per second to each host
+                (eg: CMR). If None, the rate is not limited. Throttled requests are
+                retried either way. The limit is shared by all the validations that
+                run in this process. With `processes`, it is split between the
+                downloads and the workers (see `DOWNLOAD_RATE_SHARE`).
+            cache_dir (str): If given, the downloaded metadata is cached in this
+                directory and reused as long as it is current
+            corpus (bool): If set to true, every file is a CMR search response
+                (eg: saved from a search in the echo10, dif10 or umm_json format)
+                and each of the records in it is validated
         """
 
         self.input_concept_ids = input_concept_ids
         self.query = query
+        # The revision ids of the concept ids, if known from the query
+        self.revision_ids = {}
 
-        self.concept_ids = self._cmr_query() if self.query else self.input_concept_ids
+        # For a query, the concept ids are read from CMR when they are first needed
+        self._concept_ids = None if self.query else self.input_concept_ids
 
         self.errors = []
 
@@ -70,28 +166,68 @@ class ARC:
                 ABS_PATH, f"../tests/fixtures/test_cmr_metadata.{metadata_format}"
             )
         )
+        self.file_paths = expand_file_paths(
+            [self.file_path] if isinstance(self.file_path, str) else self.file_path
+        )
+        self.corpus = corpus
         self.metadata_format = metadata_format
         self.checks_override = checks_override
         self.rules_override = rules_override
         self.messages_override = messages_override
         self.cmr_host = cmr_host
         self.version = version
-
-    def _cmr_query(self):
+        self.download_workers = download_workers
+        self.processes = processes
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.bulk_size = bulk_size
+
+        self.network_workers = network_workers
+        self.rate_limit = rate_limit
+        self.cache_dir = cache_dir
+
+    @property
+    def concept_ids(self):
         """
-        Reads from the query urls all the concept ids
+        The list of the concept ids to validate. For a query, the query is run
+        the first time they are read.
+        """
+        if self._concept_ids is None:
+            self._concept_ids = list(self._cmr_query())
+        return self._concept_ids
 
-        Returns:
-            (list of str) Returns all the concept ids found in the `query_url` as a list
+    @concept_ids.setter
+    def concept_ids(self, concept_ids):
+        self._concept_ids = concept_ids
+
+    def _iter_concept_ids(self):
+        """
+        The concept ids to validate, for the validation run. If the query hasn't
+        been run yet, the concept ids are read while the validation runs, instead
+        of waiting for all of them.
         """
-        concept_ids = []
+        if self._concept_ids is None:
+            return self._cmr_query()
+        return self._concept_ids
 
+    def _cmr_query(self):
+        """
+        Reads from the query url all the concept ids, one page at a time, so that
+        the validation can start as soon as the first page arrives. Each page is
+        read in full before its concept ids are yielded, so that no connection is
+        left open while they are validated.
+        The revision ids of the concept ids are stored in `self.revision_ids`.
+
+        Yields:
+            (str) The concept ids found in the `query_url`
+        """
         # If any of the page query params is already specified in the url, it means that
         # the user wants the subset of results provided by the query param, so we run
         # the get request only once
         # Else, we need to get all the result, not just the one in the given page since
-        # there's pagination implemented by the API. Thus, we iterate the get request with
-        # page_num query param
+        # there's pagination implemented by the API. Thus, we repeat the get request
+        # with the CMR-Search-After header from the previous response. Unlike page_num,
+        # search-after doesn't get slower the deeper it goes into the results
 
         already_selected = False
         page_qparams = ["page_size", "page_num", "offset"]
@@ -101,140 +237,390 @@ class ARC:
 
         # Set to maximum allowable so that we need the min # of get req
         page_size = 2000
-        collected = 0
-        page_num = 1
 
-        orig_query = (
+        query = (
             f"{self.query}&page_size={page_size}"
             if not already_selected
             else self.query
         )
-        query = orig_query
-        headers = get_headers()
+        headers = get_headers() or {}
 
+        collected = 0
         while True:
-            response = requests.get(query, headers=headers)
+            response = cmr_get(query, headers=headers)
 
             if response.status_code != 200:
-                return {"error": "CMR Query failed"}
-
-            response_dict = xmltodict.parse(response.text)
-            hits = int(response_dict["results"]["hits"])
-            collections = response_dict["results"]["references"]["reference"]
-
-            collected += len(collections)
-
-            concept_ids.extend([collection["id"] for collection in collections])
+                raise Exception(
+                    f"CMR Query failed with status code {response.status_code}: {query}"
+                )
 
-            if collected >= hits or already_selected:
+            # The total number of results, so that no request is made past the last page
+            hits = response.headers.get("CMR-Hits")
+            page_collected = 0
+            # At most a few hundred KB
+            for concept_id, revision_id in ARC._parse_references(
+                BytesIO(response.content)
+            ):
+                self.revision_ids[concept_id] = revision_id
+                page_collected += 1
+                yield concept_id
+            collected += page_collected
+
+            search_after = response.headers.get("CMR-Search-After")
+            if (
+                already_selected
+                or not page_collected
+                or not search_after
+                or (hits is not None and collected >= int(hits))
+            ):
                 break
+            headers = {**headers, "CMR-Search-After": search_after}
 
-            page_num += 1
-            query = f"{orig_query}&page_num={page_num}"
+    @staticmethod
+    def _parse_references(source):
+        """
+        Parses the references in a page of CMR xml search results incrementally
 
-        return concept_ids
+        Args:
+            source (file object): The CMR search response in the xml format
 
-    def validate(self):
+        Yields:
+            (tuple): (concept id, revision id) of each reference
         """
-        Validates the metadata contents of all the `concept_ids` and returns the errors
+        for _, reference in etree.iterparse(source, tag="reference"):
+            yield reference.findtext("id"), reference.findtext("revision-id")
+            # The references that are already read are not needed anymore
+            reference.clear()
+
+    def _checker_kwargs(self):
+        return {
+            "metadata_format": self.metadata_format,
+            "checks_override": self.checks_override,
+            "rules_override": self.rules_override,
+            "messages_override": self.messages_override,
+        }
+
+    def _download_kwargs(self):
+        return {
+            "metadata_format": self.metadata_format,
+            "version": self.version,
+            "cmr_host": self.cmr_host,
+            "cache_dir": self.cache_dir,
+        }
+
+    def _download(self, concept_id):
+        """
+        Downloads the metadata content for `concept_id`
 
         Returns:
-            (list of dict) The errors found in the metadata content of all the `concept_id`s
+            (tuple): (The downloaded content or None, The download errors)
         """
-        checker = Checker(
-            metadata_format=self.metadata_format,
-            checks_override=self.checks_override,
-            rules_override=self.rules_override,
-            messages_override=self.messages_override,
+        return download(
+            concept_id,
+            revision_id=self.revision_ids.get(concept_id),
+            **self._download_kwargs(),
         )
 
-        if self.concept_ids:
-            for concept_id in tqdm(self.concept_ids):
-                downloader = Downloader(
-                    concept_id, self.metadata_format, self.version, self.cmr_host
-                )
-                if not (content := downloader.download()):
-                    self.errors.append(
+    def _download_batch(self, concept_ids):
+        """
+        Downloads the metadata content for all the `concept_ids` with a single request
+
+        Returns:
+            (list of tuple): (concept id, The downloaded content or None, The download errors).
+                If the batch failed, every concept id in it has a `request_failed` error,
+                so that the other batches go on and it is retried on resume.
+        """
+        try:
+            return download_bulk(concept_ids, self.metadata_format, self.cmr_host)
+        except Exception as e:
+            return [
+                (
+                    concept_id,
+                    None,
+                    [
                         {
-                            "concept_id": concept_id,
-                            "errors": {},
-                            "pyquarc_errors": downloader.errors,
+                            "type": "request_failed",
+                            "details": {
+                                "concept_id": concept_id,
+                                "url": None,
+                                "status_code": None,
+                                "message": "The bulk download of the batch failed.",
+                                "details": str(e),
+                            },
                         }
-                    )
-                    continue
-                content = content.encode()
-                validation_errors, pyquarc_errors = checker.run(content)
-                self.errors.append(
-                    {
-                        "concept_id": concept_id,
-                        "errors": validation_errors,
-                        "pyquarc_errors": pyquarc_errors,
-                    }
+                    ],
                 )
+                for concept_id in concept_ids
+            ]
 
-        elif self.file_path:
-            with open(os.path.abspath(self.file_path), "r") as myfile:
-                content = myfile.read().encode()
-
-                validation_errors, pyquarc_errors = checker.run(content)
-                self.errors.append(
-                    {
-                        "file": self.file_path,
-                        "errors": validation_errors,
-                        "pyquarc_errors": pyquarc_errors,
-                    }
-                )
+    def _downloads(self, concept_ids):
+        """
+        Downloads the metadata of the `concept_ids` in separate threads,
+        ahead of the consumer
+
+        Yields:
+            (tuple): (concept id, The downloaded content or None, The download errors)
+                in input order
+        """
+        if self.bulk_size and not self.version:
+            # Every batch can hold many records, so fewer of them wait in the queue
+            pipeline = Pipeline(
+                self._download_batch,
+                workers=self.download_workers,
+                queue_size=self.download_workers,
+            )
+            batches = batched(
+                concept_ids, min(self.bulk_size, BulkDownloader.MAX_BATCH_SIZE)
+            )
+            for _, downloaded in pipeline.run(batches):
+                yield from downloaded
+        else:
+            pipeline = Pipeline(self._download, workers=self.download_workers)
+            for concept_id, (content, download_errors) in pipeline.run(concept_ids):
+                yield concept_id, content, download_errors
+
+    def _iter_results(self, concept_ids):
+        """
+        Validates the metadata in this process
+
+        Args:
+            concept_ids (list of str): The concept ids to validate. If None, the files
+                in `file_paths` are validated instead.
+
+        Yields:
+            (dict): The result for each concept id or file, in input order
+        """
+        checker = Checker(**self._checker_kwargs())
+
+        if concept_ids is not None:
+            # Downloads run ahead of the validation in separate threads,
+            # so that the network latency overlaps with the checks
+            for downloaded in tqdm(
+                self._downloads(concept_ids), total=ARC._count(concept_ids)
+            ):
+                yield check_concept(checker, *downloaded)
+
+        elif self.corpus:
+            for record in tqdm(iter_corpus(self.file_paths, self.metadata_format)):
+                yield check_record(checker, *record)
+
+        else:
+            for file_path in self.file_paths:
+                yield check_file(checker, file_path)
+
+    def _iter_results_in_processes(self, concept_ids):
+        """
+        Validates the metadata in a pool of `processes` worker processes.
+        Each worker builds its own checker once and then validates a share
+        of the concept ids or files. The concept ids are downloaded in this process.
+
+        Args:
+            concept_ids (list of str): The concept ids to validate. If None, the files
+                in `file_paths` are validated instead.
+
+        Yields:
+            (dict): The result for each concept id or file, in input order
+        """
+        if concept_ids is not None:
+            # The downloads run ahead here (in `download_workers` threads, or in bulk),
+            # so that the network latency overlaps with the validation in the workers
+            task, items = validate_downloaded, self._downloads(concept_ids)
+        elif self.corpus:
+            # The corpus files are split here, the workers only validate
+            task = validate_record
+            items = iter_corpus(self.file_paths, self.metadata_format)
+        else:
+            task, items = validate_file, self.file_paths
+
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=init_worker,
+            initargs=(
+                self._checker_kwargs(),
+                self._rate_limits()[1],
+                self.network_workers,
+            ),
+        ) as executor:
+            # Unlike `executor.map`, the pipeline only submits a bounded number
+            # of tasks ahead of the consumer, so finished results don't pile up
+            pipeline = Pipeline(
+                lambda item: executor.submit(task, item).result(),
+                workers=2 * self.processes,
+            )
+            for _, result in tqdm(pipeline.run(items), total=ARC._count(items)):
+                yield result
+
+    def _rate_limits(self):
+        """
+        Splits `rate_limit` between this process and the worker processes, so that
+        all of them together don't go over it. With workers, this process gets
+        `DOWNLOAD_RATE_SHARE` of it for the downloads, and the workers share the rest.
+
+        Returns:
+            (tuple): (The limit of this process, the limit of each worker),
+                None if the rate is not limited
+        """
+        if not self.rate_limit or self.processes <= 1:
+            return self.rate_limit, self.rate_limit
+        downloads = self.rate_limit * DOWNLOAD_RATE_SHARE
+        return downloads, (self.rate_limit - downloads) / self.processes
+
+    @staticmethod
+    def _count(items):
+        """
+        The number of `items` for the progress bar, None if it's not known upfront
+        """
+        return len(items) if hasattr(items, "__len__") else None
+
+    def _revision_id(self, concept_id):
+        return self.revision_ids.get(concept_id) or self.version
+
+    @staticmethod
+    def _completed(result):
+        """
+        Checks if the concept id of `result` is done for good.
+        Failed downloads are tried again when the run is resumed.
+        """
+        return not any(
+            error.get("type") == "request_failed" for error in result["pyquarc_errors"]
+        )
+
+    def iter_validate(self):
+        """
+        Validates the metadata contents of all the `concept_ids` (or files) and yields
+        the result of each one as soon as it is done. The results are not kept in
+        `self.errors`, so the memory use doesn't grow with the size of the batch.
+
+        If a `checkpoint` file is given, every concept id is recorded there once its
+        result has been consumed, and with `resume` the recorded ones are skipped.
+
+        Yields:
+            (dict) The errors found in the metadata content of a `concept_id` (or file),
+                in input order. In the form:
+                {
+                    "concept_id": concept_id (or "file": file_path),
+                    "errors": validation errors,
+                    "pyquarc_errors": errors while running pyQuARC
+                }
+        """
+        # The executor and scheduler are shared by this process, and only
+        # replaced when the settings differ
+        configure_executor(self.network_workers)
+        configure_scheduler(rate_limit=self._rate_limits()[0])
+        iter_results = (
+            self._iter_results_in_processes
+            if self.processes > 1
+            else self._iter_results
+        )
+        all_concept_ids = iter(self._iter_concept_ids())
+        # Only looks at the first one, so that a query isn't run twice
+        first = next(all_concept_ids, None)
+        if first is None:
+            yield from iter_results(None)
+            return
+        all_concept_ids = chain([first], all_concept_ids)
+        if self._concept_ids is not None:
+            # Known upfront, for the progress bar
+            all_concept_ids = self._concept_ids
+        if not self.checkpoint:
+            yield from iter_results(all_concept_ids)
+            return
+
+        with Checkpoint(self.checkpoint, resume=self.resume) as checkpoint:
+            concept_ids = (
+                concept_id
+                for concept_id in all_concept_ids
+                if not checkpoint.is_done(concept_id, self._revision_id(concept_id))
+            )
+            for result in iter_results(concept_ids):
+                yield result
+                if ARC._completed(result):
+                    concept_id = result["concept_id"]
+                    checkpoint.mark_done(concept_id, self._revision_id(concept_id))
+
+    def validate_each(self, callback):
+        """
+        Validates the metadata contents of all the `concept_ids` (or files) and calls
+        `callback` with the result of each one as soon as it is done.
+        The results are not kept in `self.errors`.
+
+        Args:
+            callback (func): Called with each result dict (see `iter_validate`)
+
+        Returns:
+            (int) The number of validated concept ids (or files)
+        """
+        count = 0
+        for result in self.iter_validate():
+            callback(result)
+            count += 1
+        return count
+
+    def validate(self):
+        """
+        Validates the metadata contents of all the `concept_ids` and returns the errors
+
+        Returns:
+            (list of dict) The errors found in the metadata content of all the `concept_id`s
+        """
+        self.errors.extend(self.iter_validate())
         return self.errors
 
     @staticmethod
     def _error_message(messages):
         severities = ["error", "warning", "info"]
-        result_string = ""
+        lines = []
         for message in messages:
             colored_message = [
                 message.replace(text, f"{COLOR[severity]}{text}{END}")
                 for severity in severities
                 if (text := severity.title()) and message.startswith(text)
             ][0]
-            result_string += f"\t\t{colored_message}{END}\n"
-        return result_string
+            lines.append(f"\t\t{colored_message}{END}\n")
+        return "".join(lines)
+
+    @staticmethod
+    def _result_string(error):
+        """
+        Builds the colored report for the result of a single concept id or file
+        """
+        title = error.get("concept_id") or error.get("file")
+        parts = [f"\n\t{COLOR['title']}{COLOR['bright']}METADATA: {title}{END}\n"]
+        validity = True
+        for field, result in error["errors"].items():
+            for rule_type, value in result.items():
+                if not value.get("valid"):
+                    messages = value.get("message")
+                    parts.append(f"\n\t>> {field}: {END}\n")
+                    parts.append(ARC._error_message(messages))
+                    if remedy := value.get("remediation"):
+                        parts.append(f"\t\t{remedy}\n")
+                    validity = False
+        if validity:
+            parts.append("\n\tNo validation errors\n")
+
+        if pyquarc_errors := error["pyquarc_errors"]:
+            parts.append(
+                f"\n\t {COLOR['title']}{COLOR['bright']} pyQuARC ERRORS: {END}\n"
+            )
+            for error in pyquarc_errors:
+                parts.append(
+                    f"\t\t  ERROR: {error['message']}. Details: {error['details']} \n"
+                )
+        return "".join(parts)
 
     def display_results(self):
-        result_string = """
+        print(
+            """
         ********************************
         ** Metadata Validation Errors **
-        ********************************\n"""
-        error_prompt = ""
+        ********************************\n""",
+            end="",
+        )
+        # Printed one result at a time instead of building one big string
         for error in self.errors:
-            title = error.get("concept_id") or error.get("file")
-            error_prompt += (
-                f"\n\t{COLOR['title']}{COLOR['bright']}METADATA: {title}{END}\n"
-            )
-            validity = True
-            for field, result in error["errors"].items():
-                for rule_type, value in result.items():
-                    if not value.get("valid"):
-                        messages = value.get("message")
-                        error_prompt += f"\n\t>> {field}: {END}\n"
-                        error_prompt += self._error_message(messages)
-                        error_prompt += (
-                            (f"\t\t{remedy}\n")
-                            if (remedy := value.get("remediation"))
-                            else ""
-                        )
-                        validity = False
-            if validity:
-                error_prompt += "\n\tNo validation errors\n"
-
-            if pyquarc_errors := error["pyquarc_errors"]:
-                error_prompt += (
-                    f"\n\t {COLOR['title']}{COLOR['bright']} pyQuARC ERRORS: {END}\n"
-                )
-                for error in pyquarc_errors:
-                    error_prompt += f"\t\t  ERROR: {error['message']}. Details: {error['details']} \n"
-
-        result_string += error_prompt
-        print(result_string)
+            print(ARC._result_string(error), end="")
+        print()
 
 
 if __name__ == "__main__":
@@ -247,6 +633,16 @@ if __name__ == "__main__":
     --format
     --cmr_host
     --version
+    --download-workers
+    --network-workers
+    --processes
+    --output
+    --checkpoint
+    --resume
+    --bulk-size
+    --rate-limit
+    --cache-dir
+    --corpus
     """
     parser = argparse.ArgumentParser()
     download_group = parser.add_mutually_exclusive_group()
@@ -263,9 +659,10 @@ if __name__ == "__main__":
     fake_group = parser.add_mutually_exclusive_group()
     fake_group.add_argument(
         "--file",
+        nargs="+",
         action="store",
         type=str,
-        help="Path to the test file, either absolute or relative to the root dir.",
+        help="Path to the test file/s or directories of them, either absolute or relative to the root dir.",
     )
     fake_group.add_argument(
         "--fake",
@@ -294,6 +691,68 @@ if __name__ == "__main__":
         type=str,
         help="The revision version of the collection. Default is the latest version.",
     )
+    parser.add_argument(
+        "--download-workers",
+        action="store",
+        type=int,
+        default=DEFAULT_DOWNLOAD_WORKERS,
+        help=f"The number of concurrent metadata downloads. Default is {DEFAULT_DOWNLOAD_WORKERS}.",
+    )
+
+    parser.add_argument(
+        "--network-workers",
+        action="store",
+        type=int,
+        default=DEFAULT_NETWORK_WORKERS,
+        help=f"The number of checks that make requests (eg: URL checks) running at the same time. Default is {DEFAULT_NETWORK_WORKERS}.",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store",
+        type=int,
+        default=1,
+        help="The number of worker processes that validate in parallel. Default is 1.",
+    )
+    parser.add_argument(
+        "--output",
+        action="store",
+        type=str,
+        help="Write the results as newline delimited JSON to this file as they come in. Use - for stdout.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store",
+        type=str,
+        help="Record the validated concept IDs (and their revision IDs) in this file.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the concept IDs that are already recorded in the --checkpoint file.",
+    )
+    parser.add_argument(
+        "--bulk-size",
+        action="store",
+        type=int,
+        help=f"Download this many records (at most {BulkDownloader.MAX_BATCH_SIZE}) with each CMR request. Only for the latest revisions.",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="store",
+        type=float,
+        help="The maximum number of requests per second to CMR, in total for all the processes. Default is no limit.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        action="store",
+        type=str,
+        help="Cache the downloaded metadata in this directory, and reuse it while it is current.",
+    )
+    parser.add_argument(
+        "--corpus",
+        action="store_true",
+        help="Each --file is a saved CMR search response (echo10, dif10 or umm_json). Validate every record in it.",
+    )
 
     args = parser.parse_args()
     parser.usage = parser.format_help().replace("optional ", "")
@@ -302,6 +761,8 @@ if __name__ == "__main__":
         parser.error(
             "No metadata given, add --query or --concept_ids or --file or --fake"
         )
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs the --checkpoint file of the interrupted run")
     format = args.format or ECHO10_C
     if format not in SUPPORTED_FORMATS:
         parser.error(
@@ -321,6 +782,25 @@ if __name__ == "__main__":
         metadata_format=args.format or ECHO10_C,
         cmr_host=get_cmr_url(),
         version=args.version,
+        download_workers=args.download_workers,
+        network_workers=args.network_workers,
+        processes=args.processes,
+        checkpoint=args.checkpoint,
+        resume=args.resume,
+        bulk_size=args.bulk_size,
+        rate_limit=args.rate_limit,
+        cache_dir=args.cache_dir,
+        corpus=args.corpus,
     )
-    results = arc.validate()
-    arc.display_results()
+    if args.output:
+        # With a checkpoint, every line is written out before its concept id
+        # is recorded, and a resumed run adds to the output of the interrupted one
+        with NdjsonWriter(
+            args.output,
+            flush_every=1 if args.checkpoint else 50,
+            append=args.resume,
+        ) as writer:
+            arc.validate_each(writer.write)
+    else:
+        results = arc.validate()
+        arc.display_results()
@@ -31,6 +31,7 @@ setuptools.setup(
     keywords="validation metadata cmr quality",
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={"fast": ["fastjsonschema>=2.16", "orjson>=3.6"]},
     package_data={"pyQuARC": ["schemas/*", "*.txt"], "tests": ["fixtures/*"]},
     include_package_data=True,
 )
@@ -0,0 +1,61 @@
+import os
+
+from pyQuARC.code.cache import MetadataCache
+
+
+class TestMetadataCache:
+    """
+    Test cases for the MetadataCache class in cache.py
+    """
+
+    def setup_method(self):
+        self.concept_id = "C1-PROV"
+        self.content = "<Collection><ShortName>ÜNICODE</ShortName></Collection>".encode()
+
+    def test_get_missing(self, tmp_path):
+        cache = MetadataCache(str(tmp_path))
+        assert cache.get(self.concept_id, "echo-c", "1") is None
+        assert cache.latest(self.concept_id, "echo-c") is None
+
+    def test_put_get(self, tmp_path):
+        cache = MetadataCache(str(tmp_path))
+        cache.put(self.concept_id, "echo-c", 1, self.content)
+
+        assert cache.get(self.concept_id, "echo-c", "1") == self.content
+        assert cache.get(self.concept_id, "dif10", "1") is None
+        # Only recorded as the latest revision when asked to
+        assert cache.latest(self.concept_id, "echo-c") is None
+        assert os.path.exists(tmp_path / "echo-c" / self.concept_id / "1.gz")
+
+    def test_put_latest(self, tmp_path):
+        cache = MetadataCache(str(tmp_path))
+        cache.put(
+            self.concept_id,
+            "echo-c",
+            "2",
+            self.content,
+            latest=True,
+            etag='"abc"',
+            last_modified="Wed, 21 Oct 2015 07:28:00 GMT",
+        )
+
+        assert cache.latest(self.concept_id, "echo-c") == {
+            "revision_id": "2",
+            "etag": '"abc"',
+            "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+        }
+
+    def test_unknown_revision(self, tmp_path):
+        cache = MetadataCache(str(tmp_path))
+        cache.put(self.concept_id, "echo-c", None, self.content, latest=True)
+
+        assert cache.latest(self.concept_id, "echo-c")["revision_id"] is None
+        assert cache.get(self.concept_id, "echo-c", None) == self.content
+
+    def test_corrupt_payload(self, tmp_path):
+        cache = MetadataCache(str(tmp_path))
+        cache.put(self.concept_id, "echo-c", "1", self.content)
+        with open(tmp_path / "echo-c" / self.concept_id / "1.gz", "wb") as payload:
+            payload.write(b"not gzip")
+
+        assert cache.get(self.concept_id, "echo-c", "1") is None
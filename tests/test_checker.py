@@ -1,5 +1,14 @@
+import json
+import threading
+import time
+
 from tests.fixtures.checker import FUNCTION_MAPPING
 from pyQuARC.code.checker import Checker
+from pyQuARC.code.custom_checker import FieldAccessor
+from pyQuARC.code.datetime_validator import DatetimeValidator
+from pyQuARC.code.url_validator import UrlValidator
+from pyQuARC.code.utils import network_bound
+from pyQuARC.code.tracker import Tracker
 from tests.common import read_test_metadata
 
 
@@ -16,7 +25,207 @@ class TestChecker:
         result = self.checker.run(self.test_metadata)
         assert result
 
+    def test_run_decoded_json(self):
+        with open("tests/fixtures/test_cmr_metadata.umm-g", "rb") as metadata_file:
+            metadata = metadata_file.read()
+        checker = Checker(metadata_format="umm-g")
+        assert checker.run(json.loads(metadata)) == checker.run(metadata)
+
     def test_map_to_function(self):
         for in_, out_ in zip(FUNCTION_MAPPING["input"], FUNCTION_MAPPING["output"]):
             result = self.checker.map_to_function(in_["datatype"], in_["function"])
             assert bool(callable(result)) == out_
+
+    def test_plan(self):
+        rule_ids = [rule.rule_id for rule in self.checker.plan]
+        applicable = [
+            rule_id
+            for rule_id in self.checker.scheduler.order_rules()
+            if self.checker.rule_mapping[rule_id]["fields_to_apply"].get("echo-c")
+        ]
+        assert rule_ids == applicable
+        for rule in self.checker.plan:
+            assert callable(rule.func)
+            assert rule.fields
+            for field in rule.fields:
+                assert field.main_field == field.field_dict["fields"][0]
+                assert len(field.accessors) == len(field.field_dict["fields"])
+
+    def test_plan_unresolved_rule(self):
+        del self.checker.checks["datetime_format_check"]["data_type"]
+        self.checker._compile_plan()
+
+        result, pyquarc_errors = self.checker.perform_custom_checks({})
+
+        assert "Collection/InsertTime" not in result
+        assert {
+            "message": "Running check for the rule: 'datetime_format_check' failed.",
+            "details": "'data_type'",
+        } in pyquarc_errors
+
+    def test_plan_network_bound(self):
+        network_bound = {
+            rule.rule_id for rule in self.checker.plan if rule.network_bound
+        }
+        assert "url_check" in network_bound
+        assert "datetime_format_check" not in network_bound
+
+    def test_tracker_copy(self):
+        fields_to_apply = {"fields_to_apply": {"echo-c": [{"fields": ["a/b"]}]}}
+        tracker = Tracker({"rule": fields_to_apply}, {}, "echo-c")
+        first, second = tracker.copy(), tracker.copy()
+        first.update_data("rule", "a/b", True)
+        assert first.read_data("rule", "a/b")["valid"] is True
+        assert second.read_data("rule", "a/b")["valid"] is None
+        tracker.update_data("rule", "a/b", False)
+        assert first.read_data("rule", "a/b")["valid"] is True
+        assert second.read_data("rule", "a/b")["applied"] is False
+
+    def test_records_start_fresh(self):
+        with open("tests/fixtures/no_error_metadata.echo-c", "rb") as metadata_file:
+            other_metadata = metadata_file.read()
+        first = self.checker.run(self.test_metadata)
+        # Nothing is left over from the first record
+        assert self.checker.run(other_metadata) == Checker().run(other_metadata)
+        assert self.checker.run(self.test_metadata) == first
+        assert not any(
+            row["applied"] for rows in self.checker.tracker.data.values() for row in rows
+        )
+
+    def _rule(self, func, **kwargs):
+        field = self.checker.plan[0].fields[0]._replace(
+            main_field="a/b",
+            field_dict={"fields": ["a/b"]},
+            accessors=(FieldAccessor.compile("a/b"),),
+            dependencies=(),
+        )
+        kwargs.setdefault("rule_id", "datetime_format_check")
+        return self.checker.plan[0]._replace(func=func, fields=(field,), **kwargs)
+
+    def test_start_rule_inline_and_on_executor(self):
+        calls = []
+
+        def check(value):
+            calls.append(threading.current_thread().name)
+            return {"valid": value == "good", "value": value}
+
+        metadata = {"a": [{"b": "good"}, {"b": "bad"}, {"b": "worse"}]}
+        fields_to_apply = {"fields_to_apply": {"echo-c": [{"fields": ["a/b"]}]}}
+        tracker = Tracker({"datetime_format_check": fields_to_apply}, {}, "echo-c")
+
+        rule = self._rule(check)
+        results, pending, error = self.checker._start_rule(rule, metadata, tracker)
+        assert not pending and not error
+        assert results[0][1]["value"] == ["bad", "worse"]
+        assert set(calls) == {threading.current_thread().name}
+
+        calls.clear()
+        rule = self._rule(check, network_bound=True)
+        results, pending, error = self.checker._start_rule(rule, metadata, tracker)
+        assert not results and len(pending[0][1]) == 3
+        results, error = self.checker._finish_rule(
+            rule, results, pending, error, tracker
+        )
+        assert results[0][1]["value"] == ["bad", "worse"]
+        assert all(name.startswith("pyquarc-network") for name in calls)
+        assert tracker.read_data("datetime_format_check", "a/b")["valid"] is False
+
+    def test_checks_run_on_their_threads(self, monkeypatch):
+        threads = {}
+
+        def recorder(rule_id):
+            def check(*args):
+                threads.setdefault(rule_id, set()).add(threading.current_thread().name)
+                return {"valid": True, "value": args[0]}
+
+            return check
+
+        monkeypatch.setattr(
+            UrlValidator,
+            "health_and_status_check",
+            staticmethod(network_bound(recorder("url_check"))),
+        )
+        monkeypatch.setattr(
+            DatetimeValidator,
+            "iso_format_check",
+            staticmethod(recorder("datetime_format_check")),
+        )
+        Checker().run(self.test_metadata)
+
+        # The check that makes requests runs on the shared executor
+        assert threads["url_check"]
+        assert all(name.startswith("pyquarc-network") for name in threads["url_check"])
+        # The others run inline
+        assert threads["datetime_format_check"] == {threading.current_thread().name}
+
+    def test_waiting_for_network_rule_uses_no_cpu(self):
+        def check(value):
+            if value == "slow":
+                time.sleep(0.5)
+            return {"valid": True, "value": value}
+
+        rule = self._rule(check, network_bound=True)
+        self.checker._set_plan((rule,), {rule.rule_id: []})
+
+        start = time.process_time()
+        result, pyquarc_errors = self.checker.perform_custom_checks(
+            {"a": [{"b": "fast"}, {"b": "slow"}]}
+        )
+        # Blocks while the slow call is pending, instead of polling the futures
+        assert time.process_time() - start < 0.2
+        assert not pyquarc_errors
+        assert result["a/b"]["datetime_format_check"]["valid"]
+
+    def test_dependent_rule_waits_for_network_rule(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_check(value):
+            started.set()
+            # Fails if the independent rule doesn't run in the meantime
+            assert release.wait(5)
+            return {"valid": True, "value": value}
+
+        def dependent_check(value):
+            return {"valid": False, "value": value}
+
+        def independent_check(value):
+            # Runs while the network rule is still waiting
+            assert started.wait(5)
+            release.set()
+            return {"valid": False, "value": value}
+
+        slow = self._rule(slow_check, network_bound=True)
+        dependent = self._rule(dependent_check)._replace(
+            rule_id="dependent",
+            fields=(
+                slow.fields[0]._replace(
+                    dependencies=(("datetime_format_check", ("a/b",)),)
+                ),
+            ),
+        )
+        independent = self._rule(independent_check, rule_id="independent")
+        fields_to_apply = {"fields_to_apply": {"echo-c": [{"fields": ["a/b"]}]}}
+        self.checker.rule_mapping = {
+            rule_id: fields_to_apply
+            for rule_id in ["datetime_format_check", "dependent", "independent"]
+        }
+        self.checker.rules_override = {}
+        self.checker._set_plan(
+            (slow, dependent, independent),
+            {
+                "datetime_format_check": [],
+                "dependent": ["datetime_format_check"],
+                "independent": [],
+            },
+        )
+
+        result, pyquarc_errors = self.checker.perform_custom_checks({"a": {"b": "x"}})
+        assert not pyquarc_errors
+        # In the order of the plan, not the order they finished in
+        assert list(result["a/b"]) == [
+            "datetime_format_check",
+            "dependent",
+            "independent",
+        ]
+        assert result["a/b"]["datetime_format_check"]["valid"]
@@ -0,0 +1,70 @@
+from pyQuARC.code.checkpoint import Checkpoint
+from pyQuARC.main import ARC
+
+
+class TestCheckpoint:
+    """
+    Test cases for the Checkpoint class in checkpoint.py
+    """
+
+    def test_resume(self, tmp_path):
+        path = str(tmp_path / "checkpoint")
+        with Checkpoint(path) as checkpoint:
+            checkpoint.mark_done("C123-PROV", "2")
+            checkpoint.mark_done("C456-PROV")
+
+        with open(path, "a") as checkpoint_file:
+            # a line cut short by a crash
+            checkpoint_file.write('{"concept_id": "C7')
+
+        with Checkpoint(path, resume=True) as checkpoint:
+            assert checkpoint.is_done("C123-PROV")
+            assert checkpoint.is_done("C123-PROV", "2")
+            assert not checkpoint.is_done("C123-PROV", "3")
+            assert checkpoint.is_done("C456-PROV", "5")
+            assert not checkpoint.is_done("C789-PROV")
+
+    def test_resume_after_truncated_line(self, tmp_path):
+        path = str(tmp_path / "checkpoint")
+        with Checkpoint(path) as checkpoint:
+            checkpoint.mark_done("C1-PROV", "1")
+
+        with open(path, "a") as checkpoint_file:
+            # a line cut short by a crash
+            checkpoint_file.write('{"concept_id": "C2", "rev')
+
+        with Checkpoint(path, resume=True) as checkpoint:
+            assert not checkpoint.is_done("C2")
+            checkpoint.mark_done("C3-PROV", "1")
+
+        with Checkpoint(path, resume=True) as checkpoint:
+            assert checkpoint.is_done("C1-PROV", "1")
+            assert checkpoint.is_done("C3-PROV", "1")
+        with open(path) as checkpoint_file:
+            assert checkpoint_file.read().count("\n") == 2
+
+        with open(path, "w") as checkpoint_file:
+            checkpoint_file.write('{"concept_id": "C4", "rev')
+        with Checkpoint(path, resume=True) as checkpoint:
+            checkpoint.mark_done("C5-PROV")
+        with Checkpoint(path, resume=True) as checkpoint:
+            assert checkpoint.is_done("C5-PROV")
+            assert not checkpoint.is_done("C4")
+
+    def test_start_over(self, tmp_path):
+        path = str(tmp_path / "checkpoint")
+        with Checkpoint(path) as checkpoint:
+            checkpoint.mark_done("C123-PROV")
+        with Checkpoint(path) as checkpoint:
+            assert not checkpoint.is_done("C123-PROV")
+
+    def test_arc_resume(self, tmp_path):
+        path = str(tmp_path / "checkpoint")
+        ARC(input_concept_ids=["invalid1", "invalid2"], checkpoint=path).validate()
+
+        results = ARC(
+            input_concept_ids=["invalid1", "invalid2", "invalid3"],
+            checkpoint=path,
+            resume=True,
+        ).validate()
+        assert [result["concept_id"] for result in results] == ["invalid3"]
@@ -1,5 +1,7 @@
+import pytest
+
 from xmltodict import parse
-from pyQuARC.code.custom_checker import CustomChecker
+from pyQuARC.code.custom_checker import CustomChecker, FieldAccessor
 from tests.fixtures.custom_checker import INPUT_OUTPUT
 from tests.common import read_test_metadata
 
@@ -97,3 +99,33 @@ class TestCustomChecker:
         assert CustomChecker._get_path_value(
             dummy_dif_metadata, "SpatialExtent/GranuleSpatialRepresentation"
         ) == ["GEODETIC"]
+
+    def test_field_accessor(self):
+        accessor = FieldAccessor.compile("DataDates/Date?Type=CREATE")
+        assert FieldAccessor.compile("DataDates/Date?Type=CREATE") is accessor
+        # The cache of the compiled paths is bounded
+        assert FieldAccessor.compile.cache_info().maxsize
+        assert accessor.keys == ("DataDates", "Date")
+        assert accessor.query_params == ("Type", "CREATE")
+
+        metadata = {
+            "DataDates": [
+                {"Type": "UPDATE", "Date": "2021-09-30"},
+                {"Type": "CREATE", "Date": "2021-09-15"},
+            ],
+            "Platforms": [{"ShortName": "Terra"}, {"LongName": "Aqua"}, "Invalid"],
+        }
+        assert accessor.values(metadata) == ["2021-09-15"]
+        assert FieldAccessor.compile("DataDates/Date?Type=DELETE").values(
+            metadata
+        ) == [None]
+        assert FieldAccessor.compile("DataDates/Date?Type").values(metadata) == [None]
+        assert FieldAccessor.compile("DataDates/Date").values(metadata) == [
+            "2021-09-30",
+            "2021-09-15",
+        ]
+        assert FieldAccessor.compile("DataDates").values(metadata) == [
+            metadata["DataDates"]
+        ]
+        with pytest.raises(TypeError):
+            FieldAccessor.compile("Platforms/ShortName").values(metadata)
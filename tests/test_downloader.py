@@ -1,4 +1,10 @@
-from pyQuARC.code.downloader import Downloader
+import glob
+import os
+
+from pyQuARC.code.cache import MetadataCache
+from pyQuARC.code.downloader import BulkDownloader, Downloader
+from pyQuARC.code.session import configure_scheduler
+from requests import Session, exceptions
 
 
 class TestDownloader:
@@ -18,6 +24,11 @@ class TestDownloader:
             },
             "invalid": "asdfasdf",
         }
+        # Fails fast when CMR can't be reached
+        configure_scheduler(max_retries=1, max_retry_time=5)
+
+    def teardown_method(self):
+        configure_scheduler()
 
     def test_download(self):
         # self.assertEqual()
@@ -129,6 +140,29 @@ class TestDownloader:
             }
         ]
 
+    def test_download_no_response(self, monkeypatch):
+        def request(session, method, url, headers=None, timeout=None):
+            raise exceptions.ConnectionError("Name or service not known")
+
+        monkeypatch.setattr(Session, "request", request)
+        monkeypatch.setattr("pyQuARC.code.session.time.sleep", lambda _: None)
+        dummy_collection = self.concept_ids["collection"]["dummy"]
+        downloader = Downloader(dummy_collection, "echo-c")
+
+        assert downloader.download() is None
+        assert downloader.errors == [
+            {
+                "type": "request_failed",
+                "details": {
+                    "concept_id": dummy_collection,
+                    "url": f"https://cmr.earthdata.nasa.gov/search/concepts/{dummy_collection}.echo10",
+                    "status_code": None,
+                    "message": Downloader.NO_RESPONSE_MESSAGE,
+                    "details": "Name or service not known",
+                },
+            }
+        ]
+
     def test_download_real_collection_no_errors(self):
         real_collection = self.concept_ids["collection"]["real"]
         downloader = Downloader(real_collection, "echo-c")
@@ -166,3 +200,180 @@ class TestDownloader:
 
         # is the concept id valid and is the request going through?
         assert downloader.errors == []
+
+
+class TestBulkDownloader:
+    """
+    Test cases for the methods in BulkDownloader class in downloader.py
+    """
+
+    ECHO10_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<results>
+    <hits>2</hits>
+    <took>10</took>
+    <result concept-id="C1-PROV" revision-id="1" format="application/echo10+xml">
+        <Collection><ShortName>ONE</ShortName></Collection>
+    </result>
+    <result concept-id="C2-PROV" revision-id="3" format="application/echo10+xml">
+        <Collection><ShortName>TWO</ShortName></Collection>
+    </result>
+</results>"""
+
+    UMM_RESPONSE = b"""{"hits": 1, "took": 5, "items": [
+        {"meta": {"concept-id": "C1-PROV", "revision-id": 1}, "umm": {"ShortName": "ONE"}}
+    ]}"""
+
+    def test_split_xml(self):
+        records = dict(BulkDownloader._split_xml(self.ECHO10_RESPONSE))
+        assert list(records) == ["C1-PROV", "C2-PROV"]
+        assert records["C2-PROV"] == b"<Collection><ShortName>TWO</ShortName></Collection>"
+
+    def test_split_json(self):
+        records = dict(BulkDownloader._split_json(self.UMM_RESPONSE))
+        assert records == {"C1-PROV": {"ShortName": "ONE"}}
+
+    def test_download(self, monkeypatch):
+        requests = []
+
+        class Response:
+            status_code = 200
+            content = self.ECHO10_RESPONSE
+
+        def request(session, method, url, data=None, headers=None, timeout=None):
+            requests.append((url, data))
+            return Response()
+
+        monkeypatch.setattr(Session, "request", request)
+        downloader = BulkDownloader(
+            ["C2-PROV", "invalid", "C1-PROV", "C3-PROV"], "echo-c"
+        )
+        downloaded = downloader.download()
+
+        assert requests == [
+            (
+                "https://cmr.earthdata.nasa.gov/search/collections.echo10",
+                {"concept_id[]": ["C2-PROV", "C1-PROV", "C3-PROV"], "page_size": 3},
+            )
+        ]
+        assert [concept_id for concept_id, _, _ in downloaded] == [
+            "C2-PROV",
+            "invalid",
+            "C1-PROV",
+            "C3-PROV",
+        ]
+        assert downloaded[0][1] == b"<Collection><ShortName>TWO</ShortName></Collection>"
+        assert downloaded[0][2] == []
+        assert downloaded[1][1] is None
+        assert downloaded[1][2][0]["type"] == "invalid_concept_id"
+        assert downloaded[3][1] is None
+        assert downloaded[3][2][0]["type"] == "request_failed"
+
+    def test_download_no_response(self, monkeypatch):
+        def request(session, method, url, data=None, headers=None, timeout=None):
+            raise exceptions.Timeout("Read timed out")
+
+        monkeypatch.setattr(Session, "request", request)
+        monkeypatch.setattr("pyQuARC.code.session.time.sleep", lambda _: None)
+        downloaded = BulkDownloader(["C1-PROV", "G1-PROV"], "echo-c").download()
+
+        assert [content for _, content, _ in downloaded] == [None, None]
+        for concept_id, _, errors in downloaded:
+            assert errors[0]["type"] == "request_failed"
+            assert errors[0]["details"]["concept_id"] == concept_id
+            assert errors[0]["details"]["details"] == "Read timed out"
+
+
+class TestCachedDownloader:
+    """
+    Test cases for downloading through the MetadataCache in downloader.py
+    """
+
+    CONTENT = b"<Collection><ShortName>ONE</ShortName></Collection>"
+
+    class Response:
+        def __init__(self, status_code, content=b"", headers=None):
+            self.status_code = status_code
+            self.content = content
+            self.text = content.decode()
+            self.headers = headers or {}
+
+    def setup_method(self):
+        self.concept_id = "C1-PROV"
+        self.requests = []
+
+    def _patch(self, monkeypatch, responses):
+        def request(session, method, url, headers=None, timeout=None):
+            self.requests.append((url, headers or {}))
+            return responses.pop(0)
+
+        monkeypatch.setattr(Session, "request", request)
+
+    def test_download_stores_in_cache(self, tmp_path, monkeypatch):
+        cache = MetadataCache(str(tmp_path))
+        self._patch(
+            monkeypatch,
+            [self.Response(200, self.CONTENT, {"CMR-Revision-Id": "2", "ETag": '"a"'})],
+        )
+        downloader = Downloader(self.concept_id, "echo-c", cache=cache)
+
+        assert downloader.download() == self.CONTENT
+        assert cache.get(self.concept_id, "echo-c", "2") == self.CONTENT
+        assert cache.latest(self.concept_id, "echo-c")["etag"] == '"a"'
+
+    def test_download_known_revision_skips_request(self, tmp_path, monkeypatch):
+        cache = MetadataCache(str(tmp_path))
+        cache.put(self.concept_id, "echo-c", "2", self.CONTENT)
+        self._patch(monkeypatch, [])
+        downloader = Downloader(self.concept_id, "echo-c", cache=cache, revision_id=2)
+
+        assert downloader.download() == self.CONTENT
+        assert self.requests == []
+
+    def test_download_revalidates_latest(self, tmp_path, monkeypatch):
+        cache = MetadataCache(str(tmp_path))
+        cache.put(self.concept_id, "echo-c", "2", self.CONTENT, latest=True, etag='"a"')
+        self._patch(monkeypatch, [self.Response(304)])
+        downloader = Downloader(self.concept_id, "echo-c", cache=cache)
+
+        assert downloader.download() == self.CONTENT
+        assert downloader.errors == []
+        assert self.requests[0][1]["If-None-Match"] == '"a"'
+
+    def test_download_revalidated_without_payload(self, tmp_path, monkeypatch):
+        cache = MetadataCache(str(tmp_path))
+        cache.put(self.concept_id, "echo-c", "2", self.CONTENT, latest=True, etag='"a"')
+        # Only latest.json is left
+        for payload in glob.glob(str(tmp_path / "**" / "*.gz"), recursive=True):
+            os.remove(payload)
+        self._patch(
+            monkeypatch,
+            [
+                self.Response(304),
+                self.Response(200, self.CONTENT, {"CMR-Revision-Id": "2", "ETag": '"a"'}),
+            ],
+        )
+        downloader = Downloader(self.concept_id, "echo-c", cache=cache)
+
+        assert downloader.download() == self.CONTENT
+        assert downloader.errors == []
+        assert "If-None-Match" not in self.requests[1][1]
+        assert cache.get(self.concept_id, "echo-c", "2") == self.CONTENT
+
+    def test_download_checks_latest_revision(self, tmp_path, monkeypatch):
+        cache = MetadataCache(str(tmp_path))
+        cache.put(self.concept_id, "echo-c", "2", self.CONTENT, latest=True)
+        references = b"""<results><references><reference>
+            <id>C1-PROV</id><revision-id>3</revision-id>
+        </reference></references></results>"""
+        new_content = b"<Collection><ShortName>NEW</ShortName></Collection>"
+        self._patch(
+            monkeypatch,
+            [
+                self.Response(200, references),
+                self.Response(200, new_content, {"CMR-Revision-Id": "3"}),
+            ],
+        )
+        downloader = Downloader(self.concept_id, "echo-c", cache=cache)
+
+        assert downloader.download() == new_content
+        assert cache.latest(self.concept_id, "echo-c")["revision_id"] == "3"
@@ -0,0 +1,68 @@
+import datetime
+import json
+import pytest
+
+from pyQuARC.code import json_backend
+
+
+@pytest.fixture(params=["installed", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_backend, "orjson", None)
+    elif not json_backend.orjson:
+        pytest.skip("orjson is not installed")
+    return json_backend
+
+
+class TestJsonBackend:
+    """
+    Test cases for json_backend.py, with and without orjson
+    """
+
+    def test_loads(self, backend):
+        assert backend.loads('{"a": [1, 2.5, "ü", null, true]}') == {
+            "a": [1, 2.5, "ü", None, True]
+        }
+        assert backend.loads(b'{"a": 1}') == {"a": 1}
+        assert backend.loads(memoryview(b'{"a": 1}')) == {"a": 1}
+        assert backend.loads(memoryview(b'[18446744073709551616]')) == [2**64]
+
+    def test_loads_stdlib_only_values(self, backend):
+        assert backend.loads('{"a": 123456789012345678901234567890}') == {
+            "a": 123456789012345678901234567890
+        }
+        assert backend.loads(b"[18446744073709551616, -9223372036854775809]") == [
+            18446744073709551616,
+            -9223372036854775809,
+        ]
+        assert backend.loads('[NaN]')[0] != backend.loads('[NaN]')[0]
+
+    def test_loads_invalid(self, backend):
+        with pytest.raises(json.JSONDecodeError):
+            backend.loads('{"a": ')
+
+    def test_dumps(self, backend):
+        result = {
+            "errors": {"Collection/ShortName": {"valid": False, "value": ("a", 1)}},
+            "set": {1},
+            "date": datetime.datetime(2020, 1, 2, 3, 4, 5),
+            1: "int key",
+            "text": "ü",
+            "big": 2**70,
+        }
+        assert backend.dumps(result, default=str) == (
+            '{"errors":{"Collection/ShortName":{"valid":false,"value":["a",1]}},'
+            f'"set":"{{1}}","date":"2020-01-02 03:04:05","1":"int key","text":"ü",'
+            f'"big":{2**70}}}'
+        )
+
+    def test_dumps_invalid(self, backend):
+        with pytest.raises(TypeError):
+            backend.dumps({"set": {1}})
+
+    def test_dumps_orjson(self):
+        orjson = pytest.importorskip("orjson")
+        value = {"float": 1e16, "list": [0.1, -0.0, "ü"]}
+        # Encoded by orjson, and decoded back to the same value
+        assert json_backend.dumps(value) == orjson.dumps(value).decode()
+        assert json_backend.loads(json_backend.dumps(value)) == value
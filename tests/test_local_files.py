@@ -0,0 +1,40 @@
+import mmap
+import os
+
+from pyQuARC.code.local_files import expand_file_paths, map_file
+
+
+class TestLocalFiles:
+    """
+    Test cases for the functions in local_files.py
+    """
+
+    def test_map_file(self, tmp_path):
+        path = tmp_path / "metadata.echo-c"
+        path.write_bytes(b"<Collection/>")
+
+        with map_file(str(path)) as content:
+            assert isinstance(content, mmap.mmap)
+            assert content[:] == b"<Collection/>"
+        assert content.closed
+
+    def test_map_empty_file(self, tmp_path):
+        path = tmp_path / "empty.echo-c"
+        path.write_bytes(b"")
+
+        with map_file(str(path)) as content:
+            assert content == b""
+
+    def test_expand_file_paths(self, tmp_path):
+        for name in ["b.echo-c", "a.echo-c", ".hidden", "sub/c.echo-c", ".git/d"]:
+            path = tmp_path / name
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b"")
+        single = str(tmp_path / "b.echo-c")
+
+        assert expand_file_paths([single, str(tmp_path)]) == [
+            single,
+            os.path.join(tmp_path, "a.echo-c"),
+            os.path.join(tmp_path, "b.echo-c"),
+            os.path.join(tmp_path, "sub", "c.echo-c"),
+        ]
@@ -0,0 +1,190 @@
+import os
+import requests
+
+from pyQuARC.code.session import get_executor, get_scheduler
+from pyQuARC.main import ARC
+
+FILES = [
+    "tests/fixtures/test_cmr_metadata.echo-c",
+    "tests/fixtures/no_error_metadata.echo-c",
+]
+
+
+class TestARC:
+    """
+    Test cases for the ARC class in main.py
+    """
+
+    def test_validate_files(self):
+        results = ARC(file_path=FILES).validate()
+        assert [result["file"] for result in results] == FILES
+
+    @staticmethod
+    def _validity(results):
+        return [
+            {
+                field: {rule_id: result["valid"] for rule_id, result in rules.items()}
+                for field, rules in result["errors"].items()
+            }
+            for result in results
+        ]
+
+    def test_validate_in_processes(self):
+        in_process = ARC(file_path=FILES).validate()
+        in_processes = ARC(file_path=FILES, processes=2).validate()
+        assert [result["file"] for result in in_processes] == FILES
+        assert self._validity(in_processes) == self._validity(in_process)
+
+    def test_validate_concept_ids_in_processes(self, monkeypatch):
+        with open(FILES[0], "rb") as metadata_file:
+            content = metadata_file.read()
+        downloaded_in = []
+
+        def download(self, concept_id):
+            downloaded_in.append(os.getpid())
+            return content, []
+
+        monkeypatch.setattr(ARC, "_download", download)
+        concept_ids = ["C1-PROV", "C2-PROV", "C3-PROV"]
+        results = ARC(input_concept_ids=concept_ids, processes=2).validate()
+        assert [result["concept_id"] for result in results] == concept_ids
+        assert all(result["errors"] for result in results)
+        # Downloaded ahead in this process, the workers only validate
+        assert downloaded_in == [os.getpid()] * 3
+
+    def test_bulk_batch_failure(self, monkeypatch):
+        with open(FILES[0], "rb") as metadata_file:
+            content = metadata_file.read()
+
+        def download_bulk(concept_ids, metadata_format, cmr_host):
+            if "C3-PROV" in concept_ids:
+                raise ConnectionError("CMR is unreachable")
+            return [(concept_id, content, []) for concept_id in concept_ids]
+
+        monkeypatch.setattr("pyQuARC.main.download_bulk", download_bulk)
+        concept_ids = ["C1-PROV", "C2-PROV", "C3-PROV", "C4-PROV", "C5-PROV"]
+        results = ARC(input_concept_ids=concept_ids, bulk_size=2).validate()
+        assert [result["concept_id"] for result in results] == concept_ids
+        failed = [result for result in results if not ARC._completed(result)]
+        assert [result["concept_id"] for result in failed] == ["C3-PROV", "C4-PROV"]
+        assert failed[0]["pyquarc_errors"][0]["details"]["details"] == (
+            "CMR is unreachable"
+        )
+        assert results[4]["errors"]
+
+    def test_arc_leaves_running_validation_alone(self):
+        executor, scheduler = get_executor(), get_scheduler()
+        results = ARC(file_path=FILES).iter_validate()
+        assert next(results)["file"] == FILES[0]
+        ARC(file_path=FILES, network_workers=3, rate_limit=5)
+        assert get_executor() is executor
+        assert get_scheduler() is scheduler
+        assert [result["file"] for result in results] == FILES[1:]
+
+    def test_rate_limits(self):
+        assert ARC(file_path=FILES)._rate_limits() == (None, None)
+        assert ARC(file_path=FILES, rate_limit=10)._rate_limits() == (10, 10)
+        downloads, worker = ARC(
+            file_path=FILES, rate_limit=10, processes=4
+        )._rate_limits()
+        # All the processes together stay within the limit
+        assert downloads + 4 * worker == 10
+        assert downloads == 5
+
+    def test_iter_validate(self):
+        arc = ARC(file_path=FILES)
+        results = arc.iter_validate()
+        assert next(results)["file"] == FILES[0]
+        assert [result["file"] for result in results] == FILES[1:]
+        assert arc.errors == []
+
+    def test_validate_each(self):
+        files = []
+        arc = ARC(file_path=FILES)
+        assert arc.validate_each(lambda result: files.append(result["file"])) == 2
+        assert files == FILES
+        assert arc.errors == []
+
+    def _mock_cmr_query(self, monkeypatch, hits=None):
+        pages = [
+            b"""<results><hits>3</hits>
+            <references>
+                <reference><id>C1-PROV</id><revision-id>2</revision-id></reference>
+                <reference><id>C2-PROV</id><revision-id>1</revision-id></reference>
+            </references></results>""",
+            b"""<results><hits>3</hits>
+            <references>
+                <reference><id>C3-PROV</id><revision-id>4</revision-id></reference>
+            </references></results>""",
+            b"<results><hits>3</hits><references></references></results>",
+        ]
+        requested = []
+
+        class Response:
+            status_code = 200
+
+            def __init__(self, content, search_after):
+                self.content = content
+                self.headers = {"CMR-Search-After": search_after}
+                if hits is not None:
+                    self.headers["CMR-Hits"] = str(hits)
+
+        def request(session, method, url, headers=None, timeout=None, stream=False):
+            # Each page is read in full, so no connection is left open
+            # while its concept ids are validated
+            assert not stream
+            requested.append(headers.get("CMR-Search-After"))
+            page = len(requested) - 1
+            return Response(pages[page], f"[{page}]")
+
+        monkeypatch.setattr(requests.Session, "request", request)
+        return requested
+
+    def test_cmr_query(self, monkeypatch):
+        requested = self._mock_cmr_query(monkeypatch)
+        arc = ARC(query="https://cmr.earthdata.nasa.gov/search/collections?provider=PROV")
+        assert arc.concept_ids == ["C1-PROV", "C2-PROV", "C3-PROV"]
+        assert requested == [None, "[0]", "[1]"]
+        assert arc.revision_ids == {"C1-PROV": "2", "C2-PROV": "1", "C3-PROV": "4"}
+        # The query is run once
+        assert len(arc.concept_ids) == 3 and arc.concept_ids[0] == "C1-PROV"
+        assert len(requested) == 3
+
+    def test_cmr_query_stops_at_hits(self, monkeypatch):
+        requested = self._mock_cmr_query(monkeypatch, hits=3)
+        arc = ARC(query="https://cmr.earthdata.nasa.gov/search/collections?provider=PROV")
+        assert arc.concept_ids == ["C1-PROV", "C2-PROV", "C3-PROV"]
+        assert requested == [None, "[0]"]
+
+    def test_iter_validate_query(self, monkeypatch):
+        requested = self._mock_cmr_query(monkeypatch, hits=3)
+        with open(FILES[0], "rb") as metadata_file:
+            content = metadata_file.read()
+        monkeypatch.setattr(ARC, "_download", lambda self, concept_id: (content, []))
+        arc = ARC(query="https://cmr.earthdata.nasa.gov/search/collections?provider=PROV")
+        results = [result["concept_id"] for result in arc.iter_validate()]
+        assert results == ["C1-PROV", "C2-PROV", "C3-PROV"]
+        assert requested == [None, "[0]"]
+
+    def test_validate_corpus(self, tmp_path):
+        records = []
+        for index, file_path in enumerate(FILES):
+            with open(file_path, "rb") as metadata_file:
+                record = metadata_file.read().split(b"?>", 1)[-1]
+            records.append(
+                f'<result concept-id="C{index}-PROV" revision-id="1">'.encode()
+                + record
+                + b"</result>"
+            )
+        corpus = tmp_path / "corpus.echo10"
+        corpus.write_bytes(b"<results><hits>2</hits>" + b"".join(records) + b"</results>")
+
+        results = ARC(file_path=str(corpus), corpus=True).validate()
+
+        assert [(result["file"], result["concept_id"]) for result in results] == [
+            (str(corpus), "C0-PROV"),
+            (str(corpus), "C1-PROV"),
+        ]
+        assert self._validity(results) == self._validity(
+            ARC(file_path=FILES).validate()
+        )
@@ -0,0 +1,121 @@
+import glob
+import os
+
+from xmltodict import parse
+
+from pyQuARC.code.checker import Checker
+from pyQuARC.code.custom_checker import CustomChecker
+from pyQuARC.code.local_files import map_file
+from pyQuARC.code.parser import (
+    BufferReader,
+    build_path_tree,
+    open_buffer,
+    parse_json,
+    parse_xml,
+    xml_to_dict,
+)
+
+XML_FORMATS = ["echo-c", "echo-g", "dif10"]
+
+
+def _xml_postprocessor(_, key, value):
+    try:
+        return key, value["#text"]
+    except (KeyError, TypeError):
+        return key, value
+
+
+class TestParser:
+    """
+    Test cases for the functions in parser.py
+    """
+
+    def setup_method(self):
+        self.fixtures = [
+            fixture
+            for fixture in glob.glob(os.path.join(os.getcwd(), "tests/fixtures/*"))
+            if fixture.rsplit(".", 1)[-1] in XML_FORMATS
+        ]
+
+    def assert_same_as_xmltodict(self, content):
+        assert xml_to_dict(parse_xml(content)) == parse(
+            content, postprocessor=_xml_postprocessor
+        )
+
+    def test_xml_to_dict_fixtures(self):
+        assert self.fixtures
+        for fixture in self.fixtures:
+            with open(fixture, "rb") as fixture_file:
+                self.assert_same_as_xmltodict(fixture_file.read())
+
+    def test_xml_to_dict_attributes_and_namespaces(self):
+        self.assert_same_as_xmltodict(
+            b"""<a xmlns="urn:a" xmlns:x="urn:x" x:y="1" xml:lang="en">
+                <b x:z="2">value</b>
+                <b/>
+                <x:c xmlns:w="urn:w"><w:d>  </w:d></x:c>
+                <e uuid="123"/>
+            </a>"""
+        )
+
+    def test_xml_to_dict_mixed_content(self):
+        self.assert_same_as_xmltodict(
+            b"""<a>text<!-- comment --> after comment
+                <b>1</b> after b <?pi data?> after pi
+                <c>2</c><c>3</c><c><d>4</d></c>
+            </a>"""
+        )
+
+    def test_parse_str(self):
+        assert xml_to_dict(parse_xml("<a><b>1</b></a>")) == {"a": {"b": "1"}}
+        assert parse_json(b'{"a": 1}') == parse_json('{"a": 1}') == {"a": 1}
+
+    def test_parse_mapped_file(self, tmp_path):
+        path = tmp_path / "metadata"
+        path.write_bytes(b'<a><b>1</b></a>')
+        with map_file(str(path)) as content:
+            assert xml_to_dict(parse_xml(content)) == {"a": {"b": "1"}}
+        path.write_bytes(b'{"a": 1}')
+        with map_file(str(path)) as content:
+            assert parse_json(content) == {"a": 1}
+
+    def test_open_buffer(self):
+        buffer = open_buffer(memoryview(b"abcde"))
+        assert isinstance(buffer, BufferReader)
+        assert buffer.read(2) == b"ab"
+        assert buffer.read(10) == b"cde"
+        assert buffer.read(2) == b""
+        assert open_buffer("abc").read() == b"abc"
+
+    def test_build_path_tree(self):
+        assert build_path_tree(
+            [["a", "b", "c"], ["a", "d"], ["a", "b"], ["a", "b", "e"], ["f"]]
+        ) == {"a": {"b": None, "d": None}, "f": None}
+
+    def test_xml_to_dict_pruned(self):
+        doc = parse_xml(
+            b"""<a>
+                <b><c>1</c><d><e>2</e></d></b>
+                <b><c>3</c></b>
+                <f><g>4</g></f>
+                <h>text<i>5</i></h>
+            </a>"""
+        )
+        path_tree = build_path_tree([["a", "b", "c"], ["a", "f", "x"], ["a", "h", "i"]])
+        assert xml_to_dict(doc, path_tree) == {
+            "a": {"b": [{"c": "1"}, {"c": "3"}], "f": {}, "h": "text"}
+        }
+
+    def test_xml_to_dict_pruned_rule_fields(self):
+        for fixture in self.fixtures:
+            metadata_format = fixture.rsplit(".", 1)[-1]
+            checker = Checker(metadata_format=metadata_format)
+            with open(fixture, "rb") as fixture_file:
+                doc = parse_xml(fixture_file.read())
+            full = xml_to_dict(doc)
+            pruned = xml_to_dict(doc, checker.path_tree)
+            for path in checker._field_paths():
+                field = "/".join(path)
+                assert CustomChecker._get_path_value(
+                    full, field
+                ) == CustomChecker._get_path_value(pruned, field)
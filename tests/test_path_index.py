@@ -0,0 +1,100 @@
+import glob
+import os
+
+import pytest
+
+from xmltodict import parse
+
+from pyQuARC.code.checker import Checker
+from pyQuARC.code.custom_checker import FieldAccessor
+from pyQuARC.code.parser import parse_json, parse_xml, xml_to_dict
+from pyQuARC.code.path_index import PathIndex
+from tests.common import read_test_metadata
+from tests.fixtures.custom_checker import INPUT_OUTPUT
+
+METADATA_FORMATS = ["echo-c", "echo-g", "dif10", "umm-c", "umm-g"]
+
+
+class TestPathIndex:
+    """
+    Test cases for the PathIndex in path_index.py
+    """
+
+    def setup_method(self):
+        self.metadata = {
+            "Platforms": [
+                {"ShortName": "Terra", "Instruments": [{"ShortName": "MODIS"}]},
+                {"ShortName": "Aqua", "LongName": "Earth Observing System, Aqua"},
+                {"Instruments": {"ShortName": "AIRS"}},
+            ],
+            "Dates": [
+                {"Type": "CREATE", "Date": "2021-09-15"},
+                {"Type": "UPDATE", "Date": "2021-09-30"},
+            ],
+            "Title": "Title",
+            "Keywords": ["a", "b"],
+            "Empty": None,
+        }
+        self.fields = [
+            "Platforms/ShortName",
+            "Platforms/LongName",
+            "Platforms/Instruments/ShortName",
+            "Platforms",
+            "Dates/Date?Type=UPDATE",
+            "Dates/Date?Type=DELETE",
+            "Dates/Date",
+            "Title",
+            "Title/Text",
+            "Keywords",
+            "Keywords/Keyword",
+            "Empty/Text",
+            "Missing/Text",
+        ]
+
+    def test_index(self):
+        accessors = [FieldAccessor.compile(field) for field in self.fields]
+        index = PathIndex(accessors).index(self.metadata)
+        assert index.get(accessors[0]) == ["Terra", "Aqua", None]
+        # Placeholders keep the values aligned with the ones of the other fields
+        assert index.get(accessors[1]) == [None, "Earth Observing System, Aqua", None]
+        assert index.get(accessors[4]) == ["2021-09-30"]
+        assert index.get(accessors[5]) == [None]
+        assert index.get(accessors[11]) == []
+        for accessor in accessors:
+            try:
+                value = accessor.values(self.metadata)
+            except TypeError:
+                with pytest.raises(TypeError):
+                    index.get(accessor)
+            else:
+                assert index.get(accessor) == value
+
+    def test_not_indexed(self):
+        index = PathIndex([]).index(self.metadata)
+        assert index.get(FieldAccessor.compile("Title")) == ["Title"]
+        assert index.get(FieldAccessor.compile("Dates/Date?Type=CREATE")) == [
+            "2021-09-15"
+        ]
+
+    def test_get_path_value_fixtures(self):
+        in_out = INPUT_OUTPUT["get_path_value"]
+        accessors = [FieldAccessor.compile(field) for field in in_out["input"]]
+        index = PathIndex(accessors).index(parse(read_test_metadata()))
+        for accessor, _out in zip(accessors, in_out["output"]):
+            assert index.get(accessor) == _out
+
+    def test_rule_fields(self):
+        for fixture in glob.glob(os.path.join(os.getcwd(), "tests/fixtures/*")):
+            metadata_format = fixture.rsplit(".", 1)[-1]
+            if metadata_format not in METADATA_FORMATS:
+                continue
+            checker = Checker(metadata_format=metadata_format)
+            with open(fixture, "rb") as fixture_file:
+                content = fixture_file.read()
+            if metadata_format.startswith("umm-"):
+                metadata = parse_json(content)
+            else:
+                metadata = xml_to_dict(parse_xml(content), checker.path_tree)
+            index = checker.path_index.index(metadata)
+            for accessor in checker.path_index.accessors:
+                assert index.get(accessor) == accessor.values(metadata)
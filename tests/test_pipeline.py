@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from pyQuARC.code.pipeline import Pipeline
+
+
+class TestPipeline:
+    """
+    Test cases for the Pipeline class in pipeline.py
+    """
+
+    def test_run_keeps_input_order(self):
+        def producer(item):
+            # later items finish first
+            time.sleep(0.01 * (5 - item))
+            return item * 2
+
+        pipeline = Pipeline(producer, workers=5)
+        assert list(pipeline.run(range(5))) == [(i, i * 2) for i in range(5)]
+
+    def test_run_limits_pending_items(self):
+        started = []
+        lock = threading.Lock()
+
+        def producer(item):
+            with lock:
+                started.append(item)
+            return item
+
+        pipeline = Pipeline(producer, workers=2, queue_size=2)
+        results = pipeline.run(range(100))
+        next(results)
+        time.sleep(0.2)
+        # the consumer took one item, so only a few more can be in flight
+        assert len(started) <= 4
+        results.close()
+
+    def test_run_raises_input_errors(self):
+        def items():
+            yield 1
+            raise ValueError("query failed")
+
+        pipeline = Pipeline(lambda item: item)
+        results = pipeline.run(items())
+        assert next(results) == (1, 1)
+        with pytest.raises(ValueError, match="query failed"):
+            next(results)
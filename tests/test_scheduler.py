@@ -0,0 +1,50 @@
+from pyQuARC.code.scheduler import Readiness, Scheduler
+
+
+class TestScheduler:
+    """
+    Test cases for the Scheduler and Readiness in scheduler.py
+    """
+
+    def setup_method(self):
+        checks = {
+            "format_check": {"data_type": "datetime"},
+            "logic_check": {
+                "data_type": "datetime",
+                "dependencies": [["format_check"]],
+            },
+            "consistency_check": {
+                "data_type": "string",
+                "dependencies": [["logic_check"], ["format_check"]],
+            },
+        }
+        fields = {"fields_to_apply": {"echo-c": [{"fields": ["a"]}]}}
+        rule_mapping = {check_id: fields for check_id in checks}
+        self.scheduler = Scheduler(rule_mapping, {}, checks, {}, "echo-c")
+
+    def test_dependency_graph(self):
+        assert self.scheduler.dependency_graph(self.scheduler.order_rules()) == {
+            "format_check": [],
+            "logic_check": ["format_check"],
+            "consistency_check": ["logic_check", "format_check"],
+        }
+        # The rules that don't run aren't waited for
+        assert self.scheduler.dependency_graph(["logic_check"]) == {"logic_check": []}
+
+    def test_readiness(self):
+        readiness = Readiness({"a": [], "b": ["a"], "c": ["a", "b"], "d": []})
+        assert readiness.ready() == ["a", "d"]
+        assert readiness.done("a") == ["b"]
+        assert readiness.done("d") == []
+        assert readiness.done("b") == ["c"]
+        assert readiness.done("c") == []
+
+    def test_readiness_copy(self):
+        readiness = Readiness({"a": [], "b": ["a"]})
+        first = readiness.copy()
+        assert first.done("a") == ["b"]
+        # Each copy starts with no rule done
+        second = readiness.copy()
+        assert second.ready() == ["a"]
+        assert second.done("a") == ["b"]
+        assert readiness.waiting_for == {"a": 0, "b": 1}
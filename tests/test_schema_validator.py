@@ -1,6 +1,14 @@
+import copy
+import json
 import os
+import pytest
+import threading
+
+from io import BytesIO
+from lxml import etree
 from xmltodict import parse
-from pyQuARC.code.schema_validator import SchemaValidator
+from pyQuARC.code.constants import SCHEMA_PATHS
+from pyQuARC.code.schema_validator import SchemaValidator, fastjsonschema
 
 KEYS = ["no_error_metadata", "bad_syntax_metadata", "test_cmr_metadata"]
 
@@ -23,3 +31,262 @@ class TestSchemaValidator:
     def test_xml_validator(self):
         for data_key in KEYS:
             assert self.schema_validator.run_xml_validator(self.data[data_key])
+
+    def test_xml_schema_cached(self):
+        SchemaValidator.clear_xml_schema_cache()
+        schema, lock = self.schema_validator.get_xml_schema()
+
+        # Shared by all the validators of the same format
+        assert SchemaValidator(None).get_xml_schema() == (schema, lock)
+        assert SchemaValidator(None, "dif10").get_xml_schema()[0] is not schema
+
+    def test_xml_schema_cache_invalidated(self, monkeypatch):
+        SchemaValidator.clear_xml_schema_cache()
+        schema, _ = self.schema_validator.get_xml_schema()
+        files = SchemaValidator._xml_schemas[
+            SCHEMA_PATHS["echo-c_schema"]
+        ]["files"]
+        assert SCHEMA_PATHS["catalog"] in files
+        assert any(file_path.endswith("MetadataCommon.xsd") for file_path in files)
+
+        # Any of the schema files changing on disk
+        signature = SchemaValidator._signature
+        monkeypatch.setattr(
+            SchemaValidator,
+            "_signature",
+            staticmethod(lambda file_paths: signature(file_paths) + (0,)),
+        )
+        assert self.schema_validator.get_xml_schema()[0] is not schema
+
+        SchemaValidator.clear_xml_schema_cache()
+        assert SchemaValidator._xml_schemas == {}
+
+    def test_json_validator_reused(self):
+        for metadata_format in ["umm-c", "umm-g"]:
+            with open(
+                os.path.join(
+                    os.getcwd(), f"tests/fixtures/test_cmr_metadata.{metadata_format}"
+                ),
+                "r",
+            ) as myfile:
+                content = myfile.read()
+            validator = SchemaValidator({}, metadata_format)
+            json_validator = validator.json_validator
+
+            errors = validator.run_json_validator(content)
+            assert validator.run_json_validator(content) == errors
+            assert validator.json_validator is json_validator
+            # The schemas are only read once
+            assert (
+                SchemaValidator({}, metadata_format).json_validator.schema
+                is json_validator.schema
+            )
+
+    def test_xml_errors_mapped_to_paths(self):
+        content = b"""<Collection>
+            <ShortName>A</ShortName>
+            <Platforms>
+                <Platform><ShortName>P1</ShortName></Platform>
+                <Platform><ShortName>P2</ShortName><Bad>1</Bad></Platform>
+            </Platforms>
+            <Unknown>x</Unknown>
+        </Collection>"""
+        doc = etree.parse(BytesIO(content))
+        index = SchemaValidator._leaf_index(doc)
+
+        assert SchemaValidator._field_path("Bad", index, doc) == (
+            "Collection/Platforms/Platform[2]/Bad"
+        )
+        # Matches more than one field
+        assert SchemaValidator._field_path("ShortName", index, doc) == "ShortName"
+        assert SchemaValidator._field_path("Platform", index, doc) == "Platform"
+        assert SchemaValidator._field_path("Missing", index, doc) == "Missing"
+
+    def test_xml_valid_skips_index(self, monkeypatch):
+        def leaf_index(doc):
+            raise AssertionError("Only needed for invalid documents")
+
+        class ValidSchema:
+            def validate(self, doc):
+                return True
+
+        monkeypatch.setattr(SchemaValidator, "_leaf_index", staticmethod(leaf_index))
+        monkeypatch.setattr(
+            self.schema_validator,
+            "get_xml_schema",
+            lambda: (ValidSchema(), threading.Lock()),
+        )
+        assert self.schema_validator.run_xml_validator(self.data[KEYS[0]]) == {}
+
+
+@pytest.mark.skipif(fastjsonschema is None, reason="fastjsonschema is not installed")
+class TestFastJsonSchemaValidator:
+    """
+    Checks that the fastjsonschema backend gives the same results as jsonschema
+    """
+
+    METADATA_SPECIFICATIONS = {
+        "umm-c": {
+            "URL": "https://cdn.earthdata.nasa.gov/umm/collection/v1.18.1",
+            "Name": "UMM-C",
+            "Version": "1.18.1",
+        },
+        "umm-g": {
+            "URL": "https://cdn.earthdata.nasa.gov/umm/granule/v1.6.5",
+            "Name": "UMM-G",
+            "Version": "1.6.5",
+        },
+    }
+
+    def read_metadata(self, metadata_format):
+        with open(
+            os.path.join(
+                os.getcwd(), f"tests/fixtures/test_cmr_metadata.{metadata_format}"
+            ),
+            "r",
+        ) as myfile:
+            return json.load(myfile)
+
+    def variants(self, metadata_format):
+        """
+        The fixture, a valid version of it, and invalid versions of that
+        """
+        metadata = self.read_metadata(metadata_format)
+        yield metadata
+        valid = copy.deepcopy(metadata)
+        valid["MetadataSpecification"] = self.METADATA_SPECIFICATIONS[metadata_format]
+        yield valid
+        for key in list(valid):
+            for value in [None, 1, "", [], "not a date"]:
+                invalid = copy.deepcopy(valid)
+                invalid[key] = value
+                yield invalid
+            missing = copy.deepcopy(valid)
+            del missing[key]
+            yield missing
+
+    @pytest.mark.parametrize("metadata_format", ["umm-c", "umm-g"])
+    def test_conformance(self, metadata_format):
+        fast_validator = SchemaValidator({}, metadata_format)
+        validator = SchemaValidator({}, metadata_format, fast_json=False)
+        assert fast_validator.fast_json_validator
+        assert not validator.fast_json_validator
+
+        verdicts = set()
+        for metadata in self.variants(metadata_format):
+            errors = validator.run_json_validator(metadata)
+            try:
+                fast_validator.fast_json_validator(metadata)
+                fast_valid = True
+            except fastjsonschema.JsonSchemaException:
+                fast_valid = False
+            assert fast_valid == (not errors)
+            assert fast_validator.run_json_validator(metadata) == errors
+            verdicts.add(fast_valid)
+        # Both valid and invalid metadata were checked
+        assert verdicts == {True, False}
+
+    @pytest.mark.parametrize(
+        "error",
+        [fastjsonschema.JsonSchemaDefinitionException("unsupported"), RecursionError()]
+        if fastjsonschema
+        else [],
+    )
+    def test_compile_failure_falls_back(self, monkeypatch, error):
+        def compile(*args, **kwargs):
+            raise error
+
+        monkeypatch.setattr(SchemaValidator, "_fast_json_validators", {})
+        monkeypatch.setattr(fastjsonschema, "compile", compile)
+        fast_validator = SchemaValidator({}, "umm-c")
+        validator = SchemaValidator({}, "umm-c", fast_json=False)
+        assert fast_validator.fast_json_validator is None
+
+        metadata = self.read_metadata("umm-c")
+        assert fast_validator.run_json_validator(metadata) == (
+            validator.run_json_validator(metadata)
+        )
+
+    def test_inline_refs(self):
+        schema = {
+            "properties": {
+                "a": {"$ref": "common.json#/definitions/A"},
+                "b": {"$ref": "#/definitions/B"},
+            },
+            "definitions": {"B": {"type": "string"}},
+        }
+        common = {
+            "$schema": "http://json-schema.org/draft-04/schema#",
+            "definitions": {
+                "A": {"$ref": "#/definitions/C"},
+                "C": {"type": "integer"},
+            },
+        }
+        inlined = SchemaValidator._inline_refs(schema, {"common.json": common})
+
+        assert inlined["properties"] == {
+            "a": {"$ref": "#/definitions/common.json/definitions/A"},
+            "b": {"$ref": "#/definitions/B"},
+        }
+        assert inlined["definitions"]["common.json"] == {
+            "definitions": {
+                "A": {"$ref": "#/definitions/common.json/definitions/C"},
+                "C": {"type": "integer"},
+            }
+        }
+        # The original schemas are left as they are
+        assert schema["properties"]["a"] == {"$ref": "common.json#/definitions/A"}
+
+    def test_escape_class_dollars(self):
+        assert SchemaValidator._escape_class_dollars("[#$%]x$") == "[#\\$%]x$"
+        assert SchemaValidator._escape_class_dollars("[]$]") == "[]\\$]"
+        assert SchemaValidator._escape_class_dollars("\\$[^$]") == "\\$[^\\$]"
+
+
+class TestParseAndValidate:
+    """
+    Test cases for parsing and validating the xml metadata in one call
+    """
+
+    def read_metadata(self, metadata_format):
+        with open(
+            os.path.join(
+                os.getcwd(), f"tests/fixtures/test_cmr_metadata.{metadata_format}"
+            ),
+            "rb",
+        ) as myfile:
+            return myfile.read()
+
+    def test_parse_and_validate_valid(self):
+        metadata = self.read_metadata("echo-g").replace(
+            b"<InsertTime>2022-04-15<", b"<InsertTime>2022-04-15T00:00:00Z<"
+        )
+        document, errors = SchemaValidator(None, "echo-g").parse_and_validate(metadata)
+
+        assert errors == {}
+        assert etree.tostring(document) == etree.tostring(
+            etree.parse(BytesIO(metadata))
+        )
+
+    def test_parse_and_validate_invalid(self):
+        for metadata_format in ["echo-c", "echo-g", "dif10"]:
+            metadata = self.read_metadata(metadata_format)
+            validator = SchemaValidator(None, metadata_format)
+            _, errors = validator.parse_and_validate(metadata)
+
+            assert errors
+            assert errors == validator.run(metadata)
+
+    def test_parse_and_validate_decoded_json(self):
+        metadata = self.read_metadata("umm-g")
+        validator = SchemaValidator(None, "umm-g")
+        decoded = json.loads(metadata)
+        document, errors = validator.parse_and_validate(decoded)
+
+        # Used as it is, without being encoded again
+        assert document is decoded
+        assert errors == validator.parse_and_validate(metadata)[1]
+
+    def test_parse_and_validate_malformed(self):
+        with pytest.raises(etree.XMLSyntaxError):
+            SchemaValidator(None, "echo-g").parse_and_validate(b"<Granule><GranuleUR>")
@@ -0,0 +1,134 @@
+import pytest
+import requests
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPMessage
+from requests.cookies import MockRequest, MockResponse
+
+from pyQuARC.code.session import (
+    RequestScheduler,
+    TokenBucket,
+    configure_executor,
+    get_executor,
+    get_external_session,
+    get_session,
+)
+from pyQuARC.code.constants import DEFAULT_NETWORK_WORKERS
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class TestSession:
+    """
+    Test cases for the sessions in session.py
+    """
+
+    def test_get_session_per_thread(self):
+        assert get_session() is get_session()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(get_session).result()
+            # Reused by the same thread
+            assert executor.submit(get_session).result() is other
+        assert other is not get_session()
+
+    def test_external_session_has_no_cookies(self):
+        session = get_external_session()
+        assert session is not get_session()
+        request = session.prepare_request(requests.Request("GET", "https://example.com"))
+        headers = HTTPMessage()
+        headers["Set-Cookie"] = "token=secret; Path=/"
+        session.cookies.extract_cookies(MockResponse(headers), MockRequest(request))
+        assert len(session.cookies) == 0
+
+    def test_get_executor_is_shared(self):
+        assert get_executor() is get_executor()
+        assert get_executor().submit(lambda: 1).result() == 1
+
+    def test_configure_executor(self):
+        executor = get_executor()
+        future = executor.submit(time.sleep, 0.1)
+        configure_executor(3)
+        assert get_executor() is not executor
+        assert get_executor()._max_workers == 3
+        # The old executor still runs what it was given
+        assert future.result() is None
+        configure_executor(3)
+        assert get_executor()._max_workers == 3
+        configure_executor(DEFAULT_NETWORK_WORKERS)
+        assert get_executor()._max_workers == DEFAULT_NETWORK_WORKERS
+
+
+class TestRequestScheduler:
+    """
+    Test cases for the RequestScheduler class in session.py
+    """
+
+    def setup_method(self):
+        self.waits = []
+
+    def _patch(self, monkeypatch, responses):
+        def request(session, method, url, **kwargs):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        monkeypatch.setattr(requests.Session, "request", request)
+        monkeypatch.setattr("pyQuARC.code.session.time.sleep", self.waits.append)
+
+    def test_retry_after(self, monkeypatch):
+        self._patch(monkeypatch, [Response(429, {"Retry-After": "3"}), Response(200)])
+        response = RequestScheduler().request("GET", "https://cmr.earthdata.nasa.gov")
+        assert response.status_code == 200
+        assert self.waits == [3]
+
+    def test_backoff(self, monkeypatch):
+        self._patch(
+            monkeypatch,
+            [Response(503), requests.ConnectionError(), Response(200)],
+        )
+        scheduler = RequestScheduler(backoff_factor=1)
+        response = scheduler.request("GET", "https://cmr.earthdata.nasa.gov")
+        assert response.status_code == 200
+        assert len(self.waits) == 2
+        assert 0 <= self.waits[0] <= 1
+        assert 0 <= self.waits[1] <= 2
+
+    def test_give_up(self, monkeypatch):
+        self._patch(monkeypatch, [Response(500), Response(500), Response(500)])
+        scheduler = RequestScheduler(max_retries=2)
+        response = scheduler.request("GET", "https://cmr.earthdata.nasa.gov")
+        assert response.status_code == 500
+        assert len(self.waits) == 2
+
+    def test_max_retry_time(self, monkeypatch):
+        self._patch(
+            monkeypatch,
+            [Response(429, {"Retry-After": "30"}), requests.ConnectionError()],
+        )
+        scheduler = RequestScheduler(max_retry_time=10)
+        response = scheduler.request("GET", "https://cmr.earthdata.nasa.gov")
+        assert response.status_code == 429
+        with pytest.raises(requests.ConnectionError):
+            RequestScheduler(max_retry_time=0).request(
+                "GET", "https://cmr.earthdata.nasa.gov"
+            )
+        assert self.waits == []
+
+    def test_no_retry(self, monkeypatch):
+        self._patch(monkeypatch, [Response(404)])
+        response = RequestScheduler().request("GET", "https://cmr.earthdata.nasa.gov")
+        assert response.status_code == 404
+        assert self.waits == []
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        assert time.monotonic() - start >= 0.09
@@ -0,0 +1,43 @@
+import json
+import pytest
+
+from pyQuARC.code import json_backend
+from pyQuARC.code.writer import NdjsonWriter
+
+
+class TestNdjsonWriter:
+    """
+    Test cases for the NdjsonWriter class in writer.py
+    """
+
+    def test_write(self, tmp_path):
+        output = tmp_path / "results.ndjson"
+        results = [
+            {"concept_id": "C123-PROV", "errors": {}, "pyquarc_errors": []},
+            {"file": "metadata.echo-c", "errors": {}, "pyquarc_errors": []},
+        ]
+        with NdjsonWriter(str(output), flush_every=1) as writer:
+            writer.write(results[0])
+            # already flushed while the run is still going
+            assert json.loads(output.read_text()) == results[0]
+            writer.write(results[1])
+
+        lines = output.read_text().splitlines()
+        assert [json.loads(line) for line in lines] == results
+
+    def test_write_unserializable_values(self, tmp_path):
+        output = tmp_path / "results.ndjson"
+        with NdjsonWriter(str(output)) as writer:
+            writer.write({"value": {1}})
+        assert json.loads(output.read_text()) == {"value": "{1}"}
+
+    @pytest.mark.parametrize("installed", [True, False])
+    def test_write_format(self, tmp_path, monkeypatch, installed):
+        if not installed:
+            monkeypatch.setattr(json_backend, "orjson", None)
+        elif not json_backend.orjson:
+            pytest.skip("orjson is not installed")
+        output = tmp_path / "results.ndjson"
+        with NdjsonWriter(str(output)) as writer:
+            writer.write({"text": "ü", "value": [1, 2.5]})
+        assert output.read_text() == '{"text":"ü","value":[1,2.5]}\n'